@@ -0,0 +1,57 @@
+from .runner import DEFAULT_SIZES, DEFAULT_TOLERANCE, run_benchmark, compare, format_results, format_heuristic_timings
+from src.utils.heuristics_func import set_heuristic_timing
+from src.config import load_config
+import argparse
+import json
+import sys
+
+DEFAULT_CONFIG_PATH = "config/default.toml"
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark",
+        description="Time move generation, evaluation and search on fixed positions"
+    )
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="board sizes")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="passes over the positions of each case")
+    parser.add_argument("-k", "--cases", nargs="+", default=None, help="only run these cases")
+    parser.add_argument("-b", "--backend", default=None, help='"graph" or "bitboard", from the config by default')
+    parser.add_argument("-c", "--config", default=None, help="config name in the config folder")
+    parser.add_argument("-o", "--output", default=None, help="save the results to this json file")
+    parser.add_argument("--baseline", default=None, help="json results to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown of the median")
+    parser.add_argument("--heuristic-timings", action="store_true", help="time the heuristics called by each case")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = load_config(f"config/{args.config}.toml" if args.config else DEFAULT_CONFIG_PATH)
+    if args.backend:
+        config.game.backend = args.backend
+    set_heuristic_timing(args.heuristic_timings)
+
+    results = run_benchmark(config, tuple(args.sizes), args.repeat, args.cases)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["meta"]["backend"] != results["meta"]["backend"]:
+            print(f"Warning: the baseline was run with the {baseline['meta']['backend']} backend")
+    print(format_results(results, baseline))
+    if args.heuristic_timings:
+        print()
+        print(format_heuristic_timings(results))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for key, previous, current in regressions:
+            print(f"Regression in {key}: {previous:.3f} ms -> {current:.3f} ms")
+        if regressions:
+            sys.exit(1)
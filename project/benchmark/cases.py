@@ -0,0 +1,103 @@
+from src.utils.heuristics_func import Heuristic, evaluate
+from src.utils.evaluation_cache import evaluation_cache
+from src.utils.manager_func import match_manager
+from src.utils.game_func import match_game
+from dataclasses import dataclass
+from src.game.game import Game
+from src.config import Config
+from typing import Callable, Optional
+import time
+
+# (elapsed time in ns, nodes, move ordering statistics of the manager if it has some) of one timed call
+TIMING = tuple[int, int, Optional[dict[str, float]]]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    # Time one call on a position
+    function: Callable[[Game, Config], TIMING]
+    # Largest board size of the case, the slow cases are skipped on big boards
+    max_size: int = 11
+
+
+def time_create_board(game: Game, config: Config) -> TIMING:
+    """Time Game.create_board on a new game"""
+    new_game = match_game(config, {})
+    start = time.perf_counter_ns()
+    new_game.create_board()
+    return time.perf_counter_ns() - start, 1, None
+
+
+def time_move(game: Game, config: Config) -> TIMING:
+    """Time Game.move with the first move of the turbo order"""
+    move = game.get_turbo_valid_moves(game.get_current_player())[0]
+    start = time.perf_counter_ns()
+    game.move(move)
+    elapsed = time.perf_counter_ns() - start
+    game.pop_move()
+    return elapsed, 1, None
+
+
+def time_copy(game: Game, config: Config) -> TIMING:
+    """Time Game.copy"""
+    start = time.perf_counter_ns()
+    game.copy()
+    return time.perf_counter_ns() - start, 1, None
+
+
+def time_turbo_valid_moves(game: Game, config: Config) -> TIMING:
+    """Time Game.get_turbo_valid_moves"""
+    start = time.perf_counter_ns()
+    game.get_turbo_valid_moves(game.get_current_player())
+    return time.perf_counter_ns() - start, 1, None
+
+
+def time_heuristic(heuristic: Heuristic) -> Callable[[Game, Config], TIMING]:
+    """Return a function timing one evaluation with the heuristic, never from the cache"""
+    def time_evaluate(game: Game, config: Config) -> TIMING:
+        evaluation_cache.clear()
+        start = time.perf_counter_ns()
+        evaluate(game, game.get_current_player(), heuristic)
+        return time.perf_counter_ns() - start, 1, None
+    return time_evaluate
+
+
+def time_manager(algorithm: str, depth: int) -> Callable[[Game, Config], TIMING]:
+    """Return a function timing one get_move of a new manager with an empty evaluation cache.
+
+    The nodes are counted, and the beta cutoffs for the managers which order
+    their moves. The worker processes of the manager, if any, are stopped
+    after the call.
+    """
+    def time_get_move(game: Game, config: Config) -> TIMING:
+        manager = match_manager(config, algorithm, depth)
+        try:
+            evaluation_cache.clear()
+            start = time.perf_counter_ns()
+            manager.get_move(game)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            manager.shutdown(wait=True)
+        move_ordering = getattr(manager, "move_ordering", None)
+        return elapsed, max(manager.nodes, 1), move_ordering.get_statistics() if move_ordering else None
+    return time_get_move
+
+
+CASES = [
+    Case("create_board", time_create_board),
+    Case("move", time_move),
+    Case("copy", time_copy),
+    Case("turbo_valid_moves", time_turbo_valid_moves),
+    Case("two_distance", time_heuristic(Heuristic.TWO_DISTANCE)),
+    Case("a_star", time_heuristic(Heuristic.A_STAR)),
+    Case("shortest_paths", time_heuristic(Heuristic.SHORTEST_PATHS)),
+    Case("resistance", time_heuristic(Heuristic.RESISTANCE)),
+    Case("random", time_manager("random", 1)),
+    Case("minimax:1", time_manager("minimax", 1)),
+    Case("alpha_beta:1", time_manager("alpha_beta", 1)),
+    Case("alpha_beta:2", time_manager("alpha_beta", 2), max_size=7),
+    Case("nega_beta:2", time_manager("nega_beta", 2), max_size=7),
+    Case("sss:2", time_manager("sss", 2), max_size=7),
+    Case("beam:4", time_manager("beam", 4)),
+]
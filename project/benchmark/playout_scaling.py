@@ -0,0 +1,66 @@
+from src.manager.parallel_playout_manager import ParallelPlayoutManager, ParallelMode
+from src.manager.mcts_manager import MCTSManager
+from .positions import get_config, get_positions
+from src.config import load_config, Config
+from dataclasses import replace
+import argparse
+import time
+import os
+
+DEFAULT_CONFIG_PATH = "config/default.toml"
+
+
+def measure(config: Config, size: int, mode: str, workers: int, time_limit_ms: int) -> float:
+    """Return the playouts per second of a manager over the positions of a size.
+
+    Mode "single" is the single-process mcts manager, the others are
+    parallel_playout modes.
+    """
+    config = get_config(config, size)
+    config = replace(
+        config,
+        user=replace(config.user, parallel_playout_mode=mode if mode != "single" else "root"),
+        mcts=replace(config.mcts, time_limit_ms=time_limit_ms, workers=workers, reuse_tree=False),
+    )
+    if mode == "single":
+        manager = MCTSManager(config)
+    else:
+        manager = ParallelPlayoutManager(config)
+        # Start the workers before timing
+        manager.get_executor().submit(int).result()
+
+    try:
+        start = time.perf_counter()
+        for game in get_positions(config, size):
+            manager.get_move(game)
+        elapsed = time.perf_counter() - start
+    finally:
+        manager.shutdown(wait=True)
+    return manager.nodes / elapsed
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmark.playout_scaling",
+        description="Measure the playouts per second of parallel_playout from 1 to N workers"
+    )
+    parser.add_argument("-s", "--size", type=int, default=11, help="board size")
+    parser.add_argument("-w", "--workers", type=int, nargs="+", default=None, help="worker counts, 1 to cpus by default")
+    parser.add_argument("-t", "--time", type=int, default=500, help="time limit in ms of each move")
+    parser.add_argument("-c", "--config", default=None, help="config name in the config folder")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = load_config(f"config/{args.config}.toml" if args.config else DEFAULT_CONFIG_PATH)
+    worker_counts = args.workers or list(range(1, (os.cpu_count() or 1) + 1))
+
+    single = measure(config, args.size, "single", 1, args.time)
+    print(f"{'mode':<14}{'workers':>8}{'playouts/s':>13}{'speedup':>9}")
+    print(f"{'single':<14}{1:>8}{single:>13.0f}{1:>9.2f}")
+    for mode in ParallelMode:
+        for workers in worker_counts:
+            rate = measure(config, args.size, mode.value, workers, args.time)
+            print(f"{mode.value:<14}{workers:>8}{rate:>13.0f}{rate / single:>9.2f}")
@@ -0,0 +1,48 @@
+from src.game.game import Game, MOVE_TYPE
+from src.utils.game_func import match_game
+from src.config import Config
+from dataclasses import replace
+import random
+
+# Part of the board filled by the positions of each suite
+FILL_RATIOS = (0.0, 0.1, 0.25, 0.4)
+POSITIONS_PER_RATIO = 2
+
+
+def get_config(config: Config, size: int) -> Config:
+    """Return the config for a size x size board"""
+    return replace(config, game=replace(config.game, board_width=size, board_height=size))
+
+
+def get_position_moves(config: Config, size: int) -> list[tuple[MOVE_TYPE, ...]]:
+    """Return the moves of the fixed positions of a size, without any finished game"""
+    config = get_config(config, size)
+    rng = random.Random(f"benchmark-{size}")
+    positions = []
+    for ratio in FILL_RATIOS:
+        for _ in range(POSITIONS_PER_RATIO):
+            game = match_game(config, {})
+            game.create_board()
+            moves = []
+            for _ in range(int(ratio * size * size)):
+                move = rng.choice(game.get_valid_moves(game.get_current_player()))
+                game.push_move(move)
+                if game.is_over():
+                    game.pop_move()
+                    break
+                moves.append(move)
+            positions.append(tuple(moves))
+    return positions
+
+
+def get_positions(config: Config, size: int) -> list[Game]:
+    """Return the fixed positions of a size"""
+    config = get_config(config, size)
+    games = []
+    for moves in get_position_moves(config, size):
+        game = match_game(config, {})
+        game.create_board()
+        for move in moves:
+            game.move(move)
+        games.append(game)
+    return games
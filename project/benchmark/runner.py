@@ -0,0 +1,121 @@
+from .positions import get_config, get_positions
+from .cases import Case, CASES
+from src.utils.evaluation_cache import evaluation_cache, configure_evaluation_cache
+from src.utils.heuristics_func import get_heuristic_timings, reset_heuristic_timings
+from src.config import Config
+from typing import Optional
+import numpy as np
+import platform
+import time
+
+DEFAULT_SIZES = (5, 7, 9, 11)
+# A case is flagged when its median time grows by more than this ratio
+DEFAULT_TOLERANCE = 0.15
+
+
+def run_case(case: Case, config: Config, size: int, repeat: int) -> dict[str, float]:
+    """Time a case on the positions of a size and return its statistics"""
+    config = get_config(config, size)
+    positions = get_positions(config, size)
+    # Warm up the caches of the size
+    case.function(positions[0], config)
+
+    times, nodes = [], 0
+    cutoffs, first_move_cutoffs = 0, 0
+    evaluation_cache.reset_statistics()
+    reset_heuristic_timings()
+    for _ in range(repeat):
+        for game in positions:
+            elapsed, count, ordering = case.function(game, config)
+            times.append(elapsed / 1e6)
+            nodes += count
+            if ordering:
+                cutoffs += ordering["cutoffs"]
+                first_move_cutoffs += ordering["first_move_cutoffs"]
+    total_seconds = sum(times) / 1000
+    # Only recorded with the heuristic timing enabled
+    heuristic_timings = {
+        heuristic.value: {"calls": timing.calls, "mean_ms": timing.get_mean_ms()}
+        for heuristic, timing in get_heuristic_timings().items()
+    }
+    return {
+        "calls": len(times),
+        "mean_ms": float(np.mean(times)),
+        "p50_ms": float(np.percentile(times, 50)),
+        "p90_ms": float(np.percentile(times, 90)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "nodes": nodes,
+        "nodes_per_sec": nodes / total_seconds if total_seconds else 0.0,
+        "cutoffs": cutoffs,
+        # Share of the beta cutoffs made by the first move searched, the higher the better the ordering
+        "first_move_cutoff_rate": first_move_cutoffs / cutoffs if cutoffs else 0.0,
+        "cache_hit_rate": evaluation_cache.get_statistics()["hit_rate"],
+        "heuristic_timings": heuristic_timings,
+    }
+
+
+def run_benchmark(config: Config, sizes: tuple[int, ...] = DEFAULT_SIZES, repeat: int = 3, names: Optional[list[str]] = None) -> dict:
+    """Run the cases on each size, results are keyed by "case@size\""""
+    configure_evaluation_cache(config.search.evaluation_cache_size)
+    results = {}
+    for size in sizes:
+        for case in CASES:
+            if size > case.max_size or (names and case.name not in names):
+                continue
+            results[f"{case.name}@{size}"] = run_case(case, config, size, repeat)
+    return {
+        "meta": {
+            "backend": config.game.backend,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[tuple[str, float, float]]:
+    """Return (case, baseline median, median) of the cases slower than the baseline"""
+    regressions = []
+    for key, statistics in results["results"].items():
+        previous = baseline["results"].get(key)
+        if previous and statistics["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append((key, previous["p50_ms"], statistics["p50_ms"]))
+    return regressions
+
+
+def format_results(results: dict, baseline: Optional[dict] = None) -> str:
+    """Return a table of the results, with the change of the median if a baseline is given"""
+    lines = [
+        f"{'case':<22}{'calls':>7}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'nodes/s':>13}{'1st cut':>9}{'cache hit':>11}"
+        + (f"{'vs base':>10}" if baseline else "")
+    ]
+    for key, statistics in results["results"].items():
+        line = (
+            f"{key:<22}{statistics['calls']:>7}{statistics['p50_ms']:>11.3f}"
+            f"{statistics['p90_ms']:>11.3f}{statistics['p99_ms']:>11.3f}{statistics['nodes_per_sec']:>13.0f}"
+            f"{format_rate(statistics.get('first_move_cutoff_rate'), statistics.get('cutoffs')):>9}"
+            f"{statistics.get('cache_hit_rate', 0.0):>11.1%}"
+        )
+        previous = baseline["results"].get(key) if baseline else None
+        if previous and previous["p50_ms"]:
+            line += f"{statistics['p50_ms'] / previous['p50_ms'] - 1:>+10.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def format_rate(rate: Optional[float], count: Optional[int]) -> str:
+    """Return the rate as a percentage, "-" if it was measured on nothing"""
+    return f"{rate:.1%}" if count else "-"
+
+
+def format_heuristic_timings(results: dict) -> str:
+    """Return a table of the time spent in the heuristics by each case, empty if none was recorded"""
+    lines = []
+    for key, statistics in results["results"].items():
+        for heuristic, timing in statistics.get("heuristic_timings", {}).items():
+            lines.append(f"{key:<22}{heuristic:<18}{timing['calls']:>9}{timing['mean_ms']:>11.3f}")
+    if not lines:
+        return ""
+    return "\n".join([f"{'case':<22}{'heuristic':<18}{'calls':>9}{'mean ms':>11}"] + lines)
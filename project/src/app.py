@@ -1,26 +1,38 @@
 from .utils.manager_func import match_manager
+from .utils.game_func import match_game
+from .utils.search_worker import SearchWorker
+from .utils.evaluation_cache import configure_evaluation_cache
 from .manager.user_manager import UserManager
-from .game.game import Game, PlayerOrder
+from .game.game import GameEvent, MoveRecord, PlayerOrder
 from .manager.manager import Manager
 from .config import load_config
-from typing import Optional
+from typing import Callable, Optional
+from dataclasses import asdict
 import logging
 import toml
 import eel
 import os
 
 RUN_EPISODES = 10
+# Seconds between two checks of the background search by the computer turns
+SEARCH_POLL_INTERVAL = 0.1
 
 
 class App:
 
     def __init__(self, config_path: str) -> None:
         self.config = load_config(config_path)
+        # Shared by the managers of the process, sized once per config
+        configure_evaluation_cache(self.config.search.evaluation_cache_size)
 
         self.player1: Optional[Manager] = None
         self.player2: Optional[Manager] = None
 
         self.game = None
+        # Searches of the managers, in the background when the graphics are enabled
+        self.search_worker = SearchWorker()
+        # True while a greenlet plays the moves of the computer
+        self.computer_playing = False
 
     def run(self) -> None:
         """Run the app with the given config"""
@@ -41,18 +53,12 @@ class App:
             + f" and Player 2 is using {self.config.user.player2_algorithm}"
         )
 
-        self.game = Game(
-            self.config,
-            {
-                PlayerOrder.PLAYER1.name: self.player1.get_move,
-                PlayerOrder.PLAYER2.name: self.player2.get_move,
-            },
-        )
-        self.game.create_board()
+        self.create_game()
 
         if self.config.graphics.graphics_enabled:
             eel.init("src/graphics/web")
             self.expose_functions()
+            self.start_computer_turns()
             eel.start(
                 "index.html",
                 mode="firefox",
@@ -62,6 +68,54 @@ class App:
         else:
             self.game.run(RUN_EPISODES)
 
+    def create_game(self) -> None:
+        """Create the game of the players, its changes are sent to the page with the graphics"""
+        self.game = match_game(self.config, self.get_player_controllers())
+        self.game.create_board()
+        if self.config.graphics.graphics_enabled:
+            self.game.add_listener(self.send_game_event)
+
+    def send_game_event(self, event: GameEvent, record: Optional[MoveRecord]) -> None:
+        """Send a change of the game to the page, then let the computer play if it is its turn"""
+        winner = self.game.get_winner()
+        eel.apply_game_event({
+            "event": event.value,
+            "cell": record.move if record else None,
+            "player": record.player.value if record else None,
+            "winner": winner.name if winner else None,
+            "current_player": self.game.get_current_player().value,
+            "human": self.eel_is_current_player_human(),
+        })
+        self.start_computer_turns()
+
+    def start_computer_turns(self) -> None:
+        """Play the moves of the computer in a greenlet of eel, unless one already does"""
+        if not self.computer_playing:
+            self.computer_playing = True
+            eel.spawn(self.play_computer_turns)
+
+    def play_computer_turns(self) -> None:
+        """Update the game until a human is to play, sending the progress of the searches to the page"""
+        try:
+            while self.game and not self.game.is_over() and not self.eel_is_current_player_human():
+                self.game.update()
+                progress = self.search_worker.get_progress()
+                if progress:
+                    eel.display_search_progress(asdict(progress))
+                eel.sleep(SEARCH_POLL_INTERVAL)
+        finally:
+            self.computer_playing = False
+
+    def get_player_controllers(self) -> dict[str, Callable]:
+        """Return the controllers of the players, the managers search in the background with the graphics"""
+        controllers = {}
+        for player, manager in ((PlayerOrder.PLAYER1, self.player1), (PlayerOrder.PLAYER2, self.player2)):
+            if not self.config.graphics.graphics_enabled or isinstance(manager, UserManager):
+                controllers[player.name] = manager.get_move
+            else:
+                controllers[player.name] = lambda game, manager=manager: self.search_worker.poll(manager, game)
+        return controllers
+
     def expose_functions(self) -> None:
         """Expose functions to JavaScript"""
         functions = self.__dir__()
@@ -107,31 +161,39 @@ class App:
             else:
                 return isinstance(self.player2, UserManager)
 
+    def eel_get_search_progress(self) -> Optional[dict]:
+        """Return the progress of the background search, None if there is none"""
+        progress = self.search_worker.get_progress()
+        if progress:
+            return asdict(progress)
+
     def eel_get_board(self) -> Optional[list[list[int]]]:
-        """Return the board"""
+        """Return the board, the page then follows the game events"""
         if self.game:
             return self.game.get_board().tolist()
 
     def eel_reset_game(self) -> None:
         """Reset the game"""
         if self.game:
+            self.search_worker.cancel()
             self.game.reset()
-            if self.player1:
-                self.player1.reset()
-            if self.player2:
-                self.player2.reset()
+            # The cancelled search may still use the tables of its manager
+            for manager in (self.player1, self.player2):
+                if manager:
+                    self.search_worker.reset(manager)
 
     def eel_undo(self) -> None:
-        """Undo the last move"""
+        """Cancel the search of the computer and undo the moves back to the last turn of the human"""
         if self.game:
-            if self.eel_is_current_player_human():
+            self.search_worker.cancel()
+            self.game.undo()
+            if not self.eel_is_current_player_human():
                 self.game.undo()
-                if not self.eel_is_current_player_human():
-                    self.game.undo()
 
     def eel_pass_turn(self) -> None:
         """Pass the turn"""
         if self.game:
+            self.search_worker.cancel()
             self.game.pass_turn()
 
     def eel_exit(self) -> None:
@@ -141,8 +203,14 @@ class App:
 
     def eel_load_config_from_file(self, filename: str) -> None:
         """Load the config"""
+        self.search_worker.cancel()
         try:
             self.config = load_config(f"config/{filename}")
+            configure_evaluation_cache(self.config.search.evaluation_cache_size)
+            # The managers are replaced, their searches may still be stopping
+            for manager in (self.player1, self.player2):
+                if manager:
+                    manager.shutdown(wait=False)
             self.player1 = match_manager(
                 self.config,
                 self.config.user.player1_algorithm,
@@ -153,14 +221,8 @@ class App:
                 self.config.user.player2_algorithm,
                 self.config.user.player2_depth,
             )
-            self.game = Game(
-                self.config,
-                {
-                    PlayerOrder.PLAYER1.name: self.player1.get_move,
-                    PlayerOrder.PLAYER2.name: self.player2.get_move,
-                },
-            )
-            self.game.create_board()
+            self.create_game()
+            self.start_computer_turns()
         except FileNotFoundError:
             raise FileNotFoundError(f"File {filename} not found")
         except Exception as e:
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dacite.core import from_dict
 import toml
 
@@ -9,6 +9,8 @@ class User:
     player2_algorithm: str
     player1_depth: int
     player2_depth: int
+    # How the parallel_playout workers share the search, "root" or "virtual_loss"
+    parallel_playout_mode: str = "root"
 
 
 @dataclass
@@ -20,12 +22,68 @@ class Graphics:
 class Game:
     board_width: int
     board_height: int
+    # "graph" (networkx) or "bitboard"
+    backend: str = "graph"
+
+
+@dataclass
+class Search:
+    # Size in MB of the transposition table of each search manager, 0 to disable it
+    transposition_size_mb: int = 16
+    # Time budget in ms of each move for alpha_beta and nega_beta, 0 to search at a fixed depth
+    time_budget_ms: int = 0
+    # Repair the two-distance maps around each move instead of recomputing them at each leaf
+    incremental_evaluation: bool = False
+    # Number of processes sharing the root moves of alpha_beta and nega_beta at a fixed depth, 1 to search sequentially
+    workers: int = 1
+    # Move ordering strategies of alpha_beta and nega_beta by priority: "tt_move", "killer", "history"
+    move_ordering: list[str] = field(default_factory=lambda: ["tt_move", "killer", "history"])
+    # Heuristic of the leaves of minimax, alpha_beta and nega_beta: "two_distance", "shortest_paths", "resistance", ...
+    heuristic: str = "two_distance"
+    # Positions kept in the evaluation cache shared by the managers of a process, 0 to disable it
+    evaluation_cache_size: int = 65536
+    # nega_beta searches the moves after the first with a null window (PVS / NegaScout), needs transposition_size_mb > 0
+    principal_variation: bool = False
+    # Half width of the window of nega_beta around the previous iteration value, only used with time_budget_ms > 0, 0 to disable
+    aspiration_window: float = 0
+    # alpha_beta and nega_beta stop at the virtual wins found by H-search and only search the mustplay region
+    virtual_connections: bool = False
+    # Smallest depth left at which the virtual connections are searched, they cost more than an evaluation
+    virtual_connections_depth: int = 2
+
+
+@dataclass
+class MCTS:
+    # Playouts of each move, used when time_limit_ms is 0
+    playouts: int = 10000
+    # Time limit in ms of each move, 0 to use the playout budget
+    time_limit_ms: int = 0
+    # UCT exploration constant
+    exploration: float = 0.4
+    # Blend the all-moves-as-first statistics into the selection
+    rave: bool = True
+    # Visits at which the RAVE and the UCT values have the same weight
+    rave_equivalence: float = 300
+    # Keep the subtree of the played moves for the next move
+    reuse_tree: bool = True
+    # Worker processes of parallel_playout, 0 for one per cpu
+    workers: int = 0
+
+
+@dataclass
+class Beam:
+    # States kept at each ply of the beam search
+    width: int = 6
+
 
 @dataclass
 class Config:
     user: User
     graphics: Graphics
     game: Game
+    search: Search = field(default_factory=Search)
+    mcts: MCTS = field(default_factory=MCTS)
+    beam: Beam = field(default_factory=Beam)
 
 
 def load_config(config_path: str) -> Config:
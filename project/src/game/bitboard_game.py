@@ -0,0 +1,248 @@
+from __future__ import annotations
+from .game import Game, PlayerOrder, MoveRecord, MOVE_TYPE
+from ..utils.neighbors import get_neighbor_table
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+from ..config import Config
+import networkx as nx
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BitboardTables:
+    """Precomputed lookups for a board of a given size"""
+    cells: tuple[MOVE_TYPE, ...]
+    indexes: dict[MOVE_TYPE, int]
+    full_mask: int
+    # Cells which are not on the first / last row (y == 0 / y == height - 1)
+    not_first_row: int
+    not_last_row: int
+    neighbor_masks: tuple[int, ...]
+    # Cell indexes sorted by distance to the center of the board
+    center_order: tuple[int, ...]
+    # (start edge mask, end edge mask) for each player
+    edge_masks: dict[PlayerOrder, tuple[int, int]]
+    # Adjacency rows of the graph of each player on the empty board
+    initial_rows: dict[PlayerOrder, tuple[int, ...]]
+
+
+def get_initial_rows(neighbor_masks: tuple[int, ...], edges: tuple[int, int]) -> tuple[int, ...]:
+    """Return the adjacency rows of the empty board, the cells of an edge are linked together and to its virtual node"""
+    size = len(neighbor_masks)
+    rows = list(neighbor_masks) + [0, 0]
+    for virtual, mask in enumerate(edges, size):
+        rows[virtual] = mask
+        for index in BitboardGame.iter_bits(mask):
+            rows[index] |= mask & ~(1 << index) | 1 << virtual
+    return tuple(rows)
+
+
+@lru_cache(maxsize=None)
+def get_bitboard_tables(width: int, height: int) -> BitboardTables:
+    """Build the lookups for a board of size width x height, once per size"""
+    table = get_neighbor_table(width, height)
+    cells, indexes = table.cells, table.indexes
+
+    def mask_of(predicate: Callable[[MOVE_TYPE], bool]) -> int:
+        return sum(1 << index for index, cell in enumerate(cells) if predicate(cell))
+
+    edge_masks = {
+        PlayerOrder.PLAYER1: (
+            mask_of(lambda cell: cell[0] == 0),
+            mask_of(lambda cell: cell[0] == width - 1)
+        ),
+        PlayerOrder.PLAYER2: (
+            mask_of(lambda cell: cell[1] == 0),
+            mask_of(lambda cell: cell[1] == height - 1)
+        ),
+    }
+    return BitboardTables(
+        cells=cells,
+        indexes=indexes,
+        full_mask=(1 << len(cells)) - 1,
+        not_first_row=mask_of(lambda cell: cell[1] != 0),
+        not_last_row=mask_of(lambda cell: cell[1] != height - 1),
+        neighbor_masks=table.neighbor_masks,
+        center_order=table.center_order,
+        edge_masks=edge_masks,
+        initial_rows={
+            player: get_initial_rows(table.neighbor_masks, edges) for player, edges in edge_masks.items()
+        },
+    )
+
+
+class BitboardGame(Game):
+    """Game backend storing the cells of each player in an integer bitboard.
+
+    Cell (x, y) is bit x * height + y. The graph of each player is kept
+    as adjacency rows, bit masks indexed like the adjacency matrices, which
+    push_move / pop_move update in place. The matrices and graphs built
+    from them are cached until the next move.
+    """
+
+    def __init__(self, config: Config, player_controllers: dict[str, Callable]) -> None:
+        super().__init__(config, player_controllers)
+        self.tables = get_bitboard_tables(self.width, self.height)
+        self.boards: dict[PlayerOrder, int] = {
+            PlayerOrder.PLAYER1: 0, PlayerOrder.PLAYER2: 0
+        }
+        self.rows: dict[PlayerOrder, list[int]] = {
+            player: list(rows) for player, rows in self.tables.initial_rows.items()
+        }
+        # Built from the rows of the current position, cleared by every move
+        self.matrices: dict[PlayerOrder, np.ndarray] = {}
+        self.built_graphs: dict[PlayerOrder, nx.Graph] = {}
+        self.empty_vector: Optional[np.ndarray] = None
+
+    # REQUESTS
+    def get_empty_mask(self) -> int:
+        """Return the bitboard of the empty cells"""
+        occupied = self.boards[PlayerOrder.PLAYER1] | self.boards[PlayerOrder.PLAYER2]
+        return self.tables.full_mask & ~occupied
+
+    def get_valid_moves(self, player: PlayerOrder) -> list[MOVE_TYPE]:
+        """Get the valid moves for the player"""
+        return [self.tables.cells[index] for index in self.iter_bits(self.get_empty_mask())]
+
+    def get_turbo_valid_moves(self, player: PlayerOrder) -> list[MOVE_TYPE]:
+        """Get the valid moves for the player ordered by distance to the center of the board"""
+        empty = self.get_empty_mask()
+        cells = self.tables.cells
+        return [cells[index] for index in self.tables.center_order if empty >> index & 1]
+
+    def get_graph(self, player: PlayerOrder) -> nx.Graph:
+        """Return the graph of the player, own cells are contracted into their neighbors"""
+        if player in self.built_graphs:
+            return self.built_graphs[player]
+        tables = self.tables
+        start, end, _, _ = self.get_start_end_order_edge(player)
+        nodes = tables.cells + (start, end)
+        rows = self.rows[player]
+
+        graph = nx.Graph()
+        graph.add_nodes_from(tables.cells[index] for index in self.iter_bits(self.get_empty_mask()))
+        graph.add_nodes_from((start, end))
+        for index, row in enumerate(rows):
+            for neighbor in self.iter_bits(row >> index + 1):
+                graph.add_edge(nodes[index], nodes[index + 1 + neighbor])
+
+        for virtual_node in (start, end):
+            for neighbor in graph.neighbors(virtual_node):
+                graph.edges[virtual_node, neighbor]["to_end"] = True
+        self.built_graphs[player] = graph
+        return graph
+
+    def get_adjacency_matrix(self, player: PlayerOrder) -> np.ndarray:
+        """Return the boolean adjacency matrix of the graph of the player, played cells have no edges.
+
+        The matrix is shared until the next move and is read only.
+        """
+        if player in self.matrices:
+            return self.matrices[player]
+        size = len(self.tables.cells) + 2
+        row_bytes = (size + 7) // 8
+        buffer = b"".join(row.to_bytes(row_bytes, "little") for row in self.rows[player])
+        bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8), bitorder="little")
+        matrix = bits.reshape(size, row_bytes * 8)[:, :size].astype(bool)
+        matrix.flags.writeable = False
+        self.matrices[player] = matrix
+        return matrix
+
+    def get_empty_vector(self) -> np.ndarray:
+        """Return a boolean vector, indexed like the adjacency matrices, of the empty cells, read only"""
+        if self.empty_vector is None:
+            size = len(self.tables.cells)
+            vector = np.zeros(size + 2, dtype=bool)
+            vector[list(self.iter_bits(self.get_empty_mask()))] = True
+            vector.flags.writeable = False
+            self.empty_vector = vector
+        return self.empty_vector
+
+    # COMMANDS
+    def create_board(self) -> None:
+        """Create empty bitboards"""
+        self.boards = {PlayerOrder.PLAYER1: 0, PlayerOrder.PLAYER2: 0}
+        self.rows = {player: list(rows) for player, rows in self.tables.initial_rows.items()}
+        self.clear_built()
+        self.create_connections()
+
+    def apply_move(self, record: MoveRecord) -> None:
+        """Set the bit of the move in the bitboard of the player and update the adjacency rows.
+
+        The cell is contracted in the graph of the player, its neighbors are
+        linked together, and removed from the graph of the opponent.
+        """
+        index = self.tables.indexes[record.move]
+        bit = 1 << index
+        self.boards[record.player] |= bit
+        changed = record.changed_rows
+        for player, rows in self.rows.items():
+            neighbors = rows[index]
+            changed.append((player, index, neighbors))
+            rows[index] = 0
+            linked = neighbors if player == record.player else 0
+            for neighbor in self.iter_bits(neighbors):
+                changed.append((player, neighbor, rows[neighbor]))
+                rows[neighbor] = (rows[neighbor] | linked) & ~(bit | 1 << neighbor)
+        self.clear_built()
+
+    def revert_move(self, record: MoveRecord) -> None:
+        """Clear the bit of the move in the bitboard of the player and restore the adjacency rows"""
+        self.boards[record.player] &= ~(1 << self.tables.indexes[record.move])
+        for player, index, row in reversed(record.changed_rows):
+            self.rows[player][index] = row
+        self.clear_built()
+
+    def clear_built(self) -> None:
+        """Forget the matrices and graphs of the previous position"""
+        self.matrices = {}
+        self.built_graphs = {}
+        self.empty_vector = None
+
+    def contract_pending(self) -> None:
+        """Nothing to contract, the graphs are built from the bitboards when needed"""
+        self.contracted = len(self.move_history)
+
+    # UTILS
+    def dilate(self, bitboard: int) -> int:
+        """Return the cells adjacent to the cells of the bitboard"""
+        height = self.height
+        tables = self.tables
+        up = bitboard & tables.not_first_row
+        down = bitboard & tables.not_last_row
+        return (
+            (bitboard >> height) | (bitboard << height)
+            | (up >> 1) | (down << 1)
+            | (down >> (height - 1)) | (up << (height - 1))
+        ) & tables.full_mask
+
+    def get_component(self, bitboard: int, seeds: int) -> int:
+        """Return the cells of bitboard connected to the seeds"""
+        component = bitboard & seeds
+        frontier = component
+        while frontier:
+            frontier = self.dilate(frontier) & bitboard & ~component
+            component |= frontier
+        return component
+
+    @staticmethod
+    def iter_bits(bitboard: int):
+        """Yield the indexes of the set bits of the bitboard in increasing order"""
+        while bitboard:
+            low = bitboard & -bitboard
+            yield low.bit_length() - 1
+            bitboard ^= low
+
+    def copy(self) -> BitboardGame:
+        """Copy the game"""
+        new_game = BitboardGame(self.config, self.player_controllers)
+        new_game.boards = self.boards.copy()
+        new_game.rows = {player: rows.copy() for player, rows in self.rows.items()}
+        new_game.stones = self.stones.copy()
+        new_game.union_find = self.union_find.copy()
+        new_game.current_player = self.current_player
+        new_game.move_history = self.move_history.copy()
+        new_game.over = self.over
+        new_game.zobrist_key = self.zobrist_key
+        return new_game
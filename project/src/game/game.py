@@ -1,6 +1,10 @@
 from __future__ import annotations
-from ..utils.neighbors import hex_neighbors
+from .union_find import UnionFind, get_union_links
+from ..utils.neighbors import get_neighbor_table
+from dataclasses import dataclass, field
+from abc import ABC, abstractmethod
 from itertools import combinations
+from functools import lru_cache
 import matplotlib.pyplot as plt
 from typing import Callable
 from ..config import Config
@@ -8,6 +12,7 @@ from typing import Optional
 from enum import Enum
 import networkx as nx
 import numpy as np
+import random
 import time
 
 
@@ -20,6 +25,71 @@ class PlayerOrder(Enum):
 MOVE_TYPE = tuple[int, int]
 
 
+@dataclass(slots=True)
+class MoveRecord:
+    """The changes made by a move, enough to take it back"""
+    move: MOVE_TYPE
+    player: PlayerOrder
+    over: bool
+    # Neighbors (with edge data) of the played cell in each graph before its removal
+    removed_edges: dict[PlayerOrder, list[tuple[MOVE_TYPE, dict]]] = field(default_factory=dict)
+    # Contraction edges added to the graph of the player
+    added_edges: list[tuple[MOVE_TYPE, MOVE_TYPE]] = field(default_factory=list)
+    # Union-find checkpoint from before the move
+    union_checkpoint: int = 0
+    # Adjacency rows changed by the move, (player, index, row before), for the bitboard backend
+    changed_rows: list[tuple[PlayerOrder, int, int]] = field(default_factory=list)
+
+
+class Tracker(ABC):
+    """State derived from the position, kept up to date by push_move / pop_move"""
+
+    @abstractmethod
+    def push_move(self, record: MoveRecord) -> None:
+        """Update the state after the move of the record"""
+        return NotImplemented
+
+    @abstractmethod
+    def pop_move(self, record: MoveRecord) -> None:
+        """Restore the state from before the move of the record"""
+        return NotImplemented
+
+
+class GameEvent(Enum):
+    """Enum for the changes of the game made from outside of the searches"""
+    MOVE = "move"
+    UNDO = "undo"
+    PASS = "pass"
+    RESET = "reset"
+
+
+# Called with the event and the record of the move played or undone, if any
+LISTENER_TYPE = Callable[[GameEvent, Optional[MoveRecord]], None]
+
+
+@dataclass(frozen=True)
+class ZobristKeys:
+    """Random 64-bit keys for each (player, cell) pair and for the side to move"""
+    cells: dict[PlayerOrder, dict[MOVE_TYPE, int]]
+    # Xored in when PLAYER2 is to move
+    side: int
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_keys(width: int, height: int) -> ZobristKeys:
+    """Return the Zobrist keys of a board, identical across processes for a given size"""
+    rng = random.Random(f"zobrist-{width}x{height}")
+    return ZobristKeys(
+        cells={
+            player: {
+                (i, j): rng.getrandbits(64) for i in range(width) for j in range(height)
+            }
+            for player in PlayerOrder
+        },
+        side=rng.getrandbits(64),
+    )
+
+
 class Game:
 
     def __init__(self, config: Config, player_controllers: dict[str, Callable]) -> None:
@@ -33,7 +103,24 @@ class Game:
         self.over = False
         self.current_player = PlayerOrder.PLAYER1
 
-        self.move_history: list[tuple[nx.Graph, nx.Graph, MOVE_TYPE, PlayerOrder]] = []
+        self.move_history: list[MoveRecord] = []
+
+        self.neighbor_table = get_neighbor_table(self.width, self.height)
+        self.union_links = get_union_links(self.width, self.height)
+        # Player value of each cell, 0 if empty, indexed like the union-find
+        self.stones: list[int] = []
+        self.union_find = UnionFind(0)
+        # Number of moves of the history contracted in the graphs
+        self.contracted = 0
+        self.create_connections()
+
+        self.zobrist_keys = get_zobrist_keys(self.width, self.height)
+        self.zobrist_key = 0
+
+        # Trackers attached to this game only, by name
+        self.trackers: dict[str, Tracker] = {}
+        # Notified of update / undo / pass_turn / reset, not of push_move / pop_move
+        self.listeners: list[LISTENER_TYPE] = []
 
     # REQUESTS
     def get_size(self) -> tuple[int, int]:
@@ -41,7 +128,9 @@ class Game:
         return self.width, self.height
 
     def get_graph(self, player: PlayerOrder) -> nx.Graph:
-        """Get the graph for the player"""
+        """Get the graph for the player, the moves not contracted yet are contracted first"""
+        if self.contracted < len(self.move_history):
+            self.contract_pending()
         return self.graphs[player]
 
     def get_start_end_order_edge(self, player: PlayerOrder) -> tuple[tuple, tuple, int, int]:
@@ -58,40 +147,67 @@ class Game:
 
     def get_valid_moves(self, player: PlayerOrder) -> list[MOVE_TYPE]:
         """Get the valid moves for the player"""
-        return list(self.get_graph(player).nodes)[:-2]
+        cells = self.neighbor_table.cells
+        return [cells[index] for index, stone in enumerate(self.stones) if not stone]
 
-    # TODO cache the valid moves
     def get_turbo_valid_moves(self, player: PlayerOrder) -> list[MOVE_TYPE]:
         """Get the valid moves for the player ordered by distance to the center of the board"""
-        graph = self.get_graph(player)
-        # -2 to remove the start and end nodes
-        moves = list(graph.nodes)[:-2]
-        # Reorder list so that center moves are checked first
-        center = np.array((self.width//2, self.height//2))
-        moves = sorted(moves, key=lambda move: np.linalg.norm(np.array(move) - center))
-        return moves
+        cells, stones = self.neighbor_table.cells, self.stones
+        return [cells[index] for index in self.neighbor_table.center_order if not stones[index]]
     
     def get_graph_valid_moves(self, graph: nx.Graph) -> list[MOVE_TYPE]:
         """Get the valid moves for the player"""
-        # -2 to remove the start and end nodes
-        return list(graph.nodes)[:-2]
+        # Remove the start and end nodes, which lie outside of the board
+        return [
+            node for node in graph.nodes
+            if 0 <= node[0] < self.width and 0 <= node[1] < self.height
+        ]
 
     def is_over(self) -> bool:
         """Check if the game is over"""
         return self.over
 
     def has_won(self, player: PlayerOrder) -> bool:
-        """Check if the player has won"""
-        graph = self.get_graph(player)
-        start, end, _, _ = self.get_start_end_order_edge(player)
-        return end in graph.neighbors(start)
+        """Check if the stones of the player connect its two edges"""
+        start, end = self.union_links.virtual_nodes[player.value - 1]
+        return self.union_find.is_connected(start, end)
 
     def get_board(self) -> np.ndarray:
-        """go through the move history and return the board"""
-        board = np.zeros((self.width, self.height))
-        for _, _, move, player in self.move_history:
-            board[move] = player.value
-        return board
+        """Return the player value of each cell, 0 if empty, built from the stones"""
+        return np.array(self.stones, dtype=np.int8).reshape(self.width, self.height)
+
+    def get_node_index(self, node: tuple[int, int]) -> int:
+        """Return the row of a node in the adjacency matrices.
+
+        Cell (x, y) is row x * height + y, the start and end nodes of the
+        players are the two last rows.
+        """
+        x, y = node
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x * self.height + y
+        size = self.width * self.height
+        # The start node is the one before the first row or column
+        return size if x == -1 or y == -1 else size + 1
+
+    def get_adjacency_matrix(self, player: PlayerOrder) -> np.ndarray:
+        """Return the boolean adjacency matrix of the graph of the player, played cells have no edges"""
+        size = self.width * self.height + 2
+        matrix = np.zeros((size, size), dtype=bool)
+        edges = [
+            (self.get_node_index(u), self.get_node_index(v))
+            for u, v in self.get_graph(player).edges
+        ]
+        if edges:
+            rows, columns = np.array(edges).T
+            matrix[rows, columns] = True
+            matrix[columns, rows] = True
+        return matrix
+
+    def get_empty_vector(self) -> np.ndarray:
+        """Return a boolean vector, indexed like the adjacency matrices, of the empty cells"""
+        vector = np.zeros(self.width * self.height + 2, dtype=bool)
+        vector[:-2] = np.array(self.stones) == 0
+        return vector
 
     def get_current_player(self) -> PlayerOrder:
         """Get the current player"""
@@ -99,14 +215,23 @@ class Game:
 
     def get_winner(self) -> Optional[PlayerOrder]:
         """Get the winner of the game"""
-        if self.over:
-            return self.get_current_player()
+        for player in PlayerOrder:
+            if self.has_won(player):
+                return player
         return None
 
-    def get_move_history(self) -> list[tuple[nx.Graph, nx.Graph, MOVE_TYPE, PlayerOrder]]:
+    def get_move_history(self) -> list[MoveRecord]:
         """Get the move history"""
         return self.move_history
 
+    def get_tracker(self, name: str) -> Optional[Tracker]:
+        """Get the tracker attached under name, if any"""
+        return self.trackers.get(name)
+
+    def get_zobrist_key(self) -> int:
+        """Get the 64-bit Zobrist key of the position, side to move included"""
+        return self.zobrist_key
+
     # COMMANDS
     def create_board(self) -> None:
         """Create a graph representation of hex for a board of size x size"""
@@ -123,15 +248,11 @@ class Game:
             )
             
             # Add nodes
-            graph.add_nodes_from(
-                [(i, j) for i in range(self.width) for j in range(self.height)]
-            )
+            graph.add_nodes_from(self.neighbor_table.cells)
 
             # Add adjacency edges (ie connect (0,0) to (0,1), (1,0) and (1,1)...)
-            for node in graph.nodes:
-                neighbors = hex_neighbors(node, self.config)
-                neighbors_edges = zip([(node)] * len(neighbors), neighbors)
-                graph.add_edges_from(neighbors_edges)
+            for node, neighbors in zip(self.neighbor_table.cells, self.neighbor_table.neighbors):
+                graph.add_edges_from((node, neighbor) for neighbor in neighbors)
 
             # Add border edges (ie connect (0,0) to (0,1), (0,2), (0,3) and (0,4)...)
             for i in range(edge_size):
@@ -145,35 +266,137 @@ class Game:
             for i in range(edge_size):
                 graph.add_edge(start, (0, i)[::order], to_end=True)
                 graph.add_edge(end, (edge_size - 1, i)[::order], to_end=True)
+        self.create_connections()
+
+    def create_connections(self) -> None:
+        """Create an empty board of stones and its union-find, with the four virtual edge nodes"""
+        size = self.width * self.height
+        self.stones = [0] * size
+        self.union_find = UnionFind(size + 4)
+        self.contracted = 0
 
     def move(self, move: MOVE_TYPE, save: bool = True) -> None:
         """Make a move, add to the move history if save is True"""
-        graph = self.get_graph(self.current_player)
-        opponent_graph = self.get_graph(self.get_opponent())
+        self.push_move(move)
+        if not save:
+            self.contract_pending()
+            self.move_history.pop()
+            self.contracted -= 1
+
+    def push_move(self, move: MOVE_TYPE) -> MoveRecord:
+        """Make a move in place and record what it changed so pop_move can take it back"""
+        player = self.current_player
+        record = MoveRecord(move, player, self.over, union_checkpoint=self.union_find.get_checkpoint())
+        self.apply_move(record)
+        self.connect_stone(record)
+        self.zobrist_key ^= self.zobrist_keys.cells[player][move]
+        self.move_history.append(record)
+        for tracker in self.trackers.values():
+            tracker.push_move(record)
+
+        if self.has_won(player):
+            self.over = True
+            return record
+
+        self.current_player = self.get_opponent()
+        self.zobrist_key ^= self.zobrist_keys.side
+        return record
+
+    def pop_move(self) -> MoveRecord:
+        """Take back the last move made with push_move"""
+        record = self.move_history.pop()
+        self.revert_move(record)
+        self.union_find.rollback(record.union_checkpoint)
+        x, y = record.move
+        self.stones[x * self.height + y] = 0
+        for tracker in reversed(self.trackers.values()):
+            tracker.pop_move(record)
+        if self.current_player != record.player:
+            self.zobrist_key ^= self.zobrist_keys.side
+        self.zobrist_key ^= self.zobrist_keys.cells[record.player][record.move]
+
+        self.current_player = record.player
+        self.over = record.over
+        return record
+
+    def apply_move(self, record: MoveRecord) -> None:
+        """Nothing to do, the graphs are contracted when get_graph needs them"""
+        pass
+
+    def revert_move(self, record: MoveRecord) -> None:
+        """Restore the graphs as they were before the move of the record, if it was contracted"""
+        if self.contracted > len(self.move_history):
+            self.uncontract(record)
+            self.contracted -= 1
+
+    def connect_stone(self, record: MoveRecord) -> None:
+        """Put the stone of the record on the board and merge it with its group and edges"""
+        x, y = record.move
+        index = x * self.height + y
+        value = record.player.value
+        self.stones[index] = value
+        union_find = self.union_find
+        for neighbor in self.union_links.neighbors[index]:
+            if self.stones[neighbor] == value:
+                union_find.union(index, neighbor)
+        for edge in self.union_links.edges[value - 1][index]:
+            union_find.union(index, edge)
+
+    def contract_pending(self) -> None:
+        """Contract the moves of the history which are not in the graphs yet"""
+        for record in self.move_history[self.contracted:]:
+            self.contract(record)
+        self.contracted = len(self.move_history)
+
+    def contract(self, record: MoveRecord) -> None:
+        """Update the graphs for the move of the record and save what changed in it"""
+        move, player = record.move, record.player
+        opponent = PlayerOrder.PLAYER1 if player == PlayerOrder.PLAYER2 else PlayerOrder.PLAYER2
+        graph = self.graphs[player]
+        opponent_graph = self.graphs[opponent]
+
+        record.removed_edges[player] = list(graph.adj[move].items())
+        record.removed_edges[opponent] = list(opponent_graph.adj[move].items())
 
-        if save:
-            self.move_history.append((graph.copy(), opponent_graph.copy(), move, self.current_player))
         neighbors = list(graph.neighbors(move))
-        for neighbor in combinations(neighbors, 2):
-            graph.add_edge(*neighbor)
+        for u, v in combinations(neighbors, 2):
+            if not graph.has_edge(u, v):
+                graph.add_edge(u, v)
+                record.added_edges.append((u, v))
         graph.remove_node(move)
         opponent_graph.remove_node(move)
 
-        if self.has_won(self.current_player):
-            self.over = True
-            return
+    def uncontract(self, record: MoveRecord) -> None:
+        """Restore the graphs as they were before the contraction of the record"""
+        move = record.move
+        self.graphs[record.player].remove_edges_from(record.added_edges)
+        for player, neighbors in record.removed_edges.items():
+            graph = self.graphs[player]
+            graph.add_node(move)
+            graph.add_edges_from((move, neighbor, data) for neighbor, data in neighbors)
 
-        self.current_player = self.get_opponent()
+    def add_tracker(self, name: str, tracker: Tracker) -> None:
+        """Attach a tracker, it must describe the current position"""
+        self.trackers[name] = tracker
+
+    def remove_tracker(self, name: str) -> None:
+        """Detach the tracker attached under name"""
+        self.trackers.pop(name, None)
+
+    def add_listener(self, listener: LISTENER_TYPE) -> None:
+        """Call the listener after each update, undo, pass_turn and reset"""
+        self.listeners.append(listener)
+
+    def notify(self, event: GameEvent, record: Optional[MoveRecord] = None) -> None:
+        """Call the listeners with the event"""
+        for listener in self.listeners:
+            listener(event, record)
 
     def undo(self) -> None:
         """Undo the last move"""
         if not self.move_history or self.is_over():
             return
-        graph, opponent_graph, move, player = self.move_history.pop()
-
-        self.current_player = player
-        self.graphs[player] = graph
-        self.graphs[self.get_opponent()] = opponent_graph
+        self.notify(GameEvent.UNDO, self.pop_move())
 
     def update(self) -> None:
         """Update the game state"""
@@ -186,6 +409,7 @@ class Game:
         if move is None or move not in self.get_valid_moves(self.current_player):
             return
         self.move(move)
+        self.notify(GameEvent.MOVE, self.move_history[-1])
 
     def reset(self) -> None:
         """Reset the game"""
@@ -193,6 +417,8 @@ class Game:
         self.move_history = []
         self.over = False
         self.current_player = PlayerOrder.PLAYER1
+        self.zobrist_key = 0
+        self.notify(GameEvent.RESET)
 
     def run(self, episodes: int, verbose: bool = False) -> None:
         """Run the game until it is over"""
@@ -212,17 +438,25 @@ class Game:
     def pass_turn(self) -> None:
         """Pass the turn"""
         self.current_player = self.get_opponent()
+        self.zobrist_key ^= self.zobrist_keys.side
+        self.notify(GameEvent.PASS)
 
     # UTILS
     def copy(self) -> Game:
         """Copy the game"""
+        # The records are shared, contract them first so that they are not changed afterwards
+        self.contract_pending()
         new_game = Game(self.config, self.player_controllers)
+        new_game.stones = self.stones.copy()
+        new_game.union_find = self.union_find.copy()
+        new_game.contracted = self.contracted
         new_game.graphs = {
             player: graph.copy() for player, graph in self.graphs.items()
         }
         new_game.current_player = self.current_player
         new_game.move_history = self.move_history.copy()
         new_game.over = self.over
+        new_game.zobrist_key = self.zobrist_key
         return new_game
 
     def draw_graph(self, player: PlayerOrder) -> None:
@@ -246,4 +480,4 @@ class Game:
 
     def __hash__(self) -> int:
         """Hash the game"""
-        return hash(str(self.get_board()))
+        return self.zobrist_key
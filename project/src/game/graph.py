@@ -1,5 +1,5 @@
 from __future__ import annotations
-from ..utils.neighbors import hex_neighbors
+from ..utils.neighbors import get_neighbor_table
 from itertools import combinations
 import matplotlib.pyplot as plt
 from ..config import Config
@@ -72,11 +72,10 @@ class GameGraph:
         self.end = (edgeSize,edgeSize//2)[::order]
 
         # Add connections
-        self.graph.add_nodes_from([(i, j) for i in range(self.size[0]) for j in range(self.size[1])])
-        for node in self.graph.nodes:
-            neig = hex_neighbors(node, config)
-            neigEdges = zip([(node)] * len(neig), neig)
-            self.graph.add_edges_from(neigEdges)
+        neighborTable = get_neighbor_table(*self.size)
+        self.graph.add_nodes_from(neighborTable.cells)
+        for node, neig in zip(neighborTable.cells, neighborTable.neighbors):
+            self.graph.add_edges_from((node, neighbor) for neighbor in neig)
 
         # Add connections to fake nodes
         for i in range(edgeSize):
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from ..utils.neighbors import get_neighbor_table
+from functools import lru_cache
+
+
+@dataclass(frozen=True)
+class UnionLinks:
+    """Lookups of the stone connections for a board of a given size.
+
+    Cell (x, y) is node x * height + y. The four virtual edge nodes come
+    after the cells: start and end of PLAYER1 (x == 0 / x == width - 1)
+    then start and end of PLAYER2 (y == 0 / y == height - 1).
+    """
+    neighbors: tuple[tuple[int, ...], ...]
+    # Virtual nodes touched by each cell, for PLAYER1 and PLAYER2
+    edges: tuple[tuple[tuple[int, ...], ...], tuple[tuple[int, ...], ...]]
+    # (start, end) virtual nodes of PLAYER1 and PLAYER2
+    virtual_nodes: tuple[tuple[int, int], tuple[int, int]]
+
+
+@lru_cache(maxsize=None)
+def get_union_links(width: int, height: int) -> UnionLinks:
+    """Build the lookups for a board of size width x height, once per size"""
+    size = width * height
+    table = get_neighbor_table(width, height)
+    player1_edges = tuple(
+        tuple(node for node, on_edge in ((size, x == 0), (size + 1, x == width - 1)) if on_edge)
+        for x, _ in table.cells
+    )
+    player2_edges = tuple(
+        tuple(node for node, on_edge in ((size + 2, y == 0), (size + 3, y == height - 1)) if on_edge)
+        for _, y in table.cells
+    )
+    return UnionLinks(
+        neighbors=table.neighbor_indexes,
+        edges=(player1_edges, player2_edges),
+        virtual_nodes=((size, size + 1), (size + 2, size + 3)),
+    )
+
+
+class UnionFind:
+    """Disjoint sets with union by size and rollback.
+
+    There is no path compression so that each union can be undone, the
+    union by size keeps the trees of logarithmic depth.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.parents = list(range(size))
+        self.sizes = [1] * size
+        # Roots attached to another root, in order
+        self.history: list[int] = []
+
+    # REQUESTS
+    def find(self, node: int) -> int:
+        """Return the root of the set of the node"""
+        parents = self.parents
+        while parents[node] != node:
+            node = parents[node]
+        return node
+
+    def is_connected(self, first: int, second: int) -> bool:
+        """Check if the two nodes are in the same set"""
+        return self.find(first) == self.find(second)
+
+    def get_checkpoint(self) -> int:
+        """Return a checkpoint to give to rollback"""
+        return len(self.history)
+
+    # COMMANDS
+    def union(self, first: int, second: int) -> None:
+        """Merge the sets of the two nodes"""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+        if self.sizes[first] > self.sizes[second]:
+            first, second = second, first
+        self.parents[first] = second
+        self.sizes[second] += self.sizes[first]
+        self.history.append(first)
+
+    def rollback(self, checkpoint: int) -> None:
+        """Undo the unions made since the checkpoint"""
+        parents, sizes, history = self.parents, self.sizes, self.history
+        while len(history) > checkpoint:
+            node = history.pop()
+            sizes[parents[node]] -= sizes[node]
+            parents[node] = node
+
+    # UTILS
+    def copy(self) -> UnionFind:
+        """Copy the sets"""
+        new_union_find = UnionFind(0)
+        new_union_find.parents = self.parents.copy()
+        new_union_find.sizes = self.sizes.copy()
+        new_union_find.history = self.history.copy()
+        return new_union_find
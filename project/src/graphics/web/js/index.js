@@ -5,6 +5,9 @@ class HexagonGame {
         this.colNumber = colNumber;
         this.radius = radius;
         this.over = false;
+        this.currentPlayer = 1;
+        // Player value of each cell, 0 if empty, kept up to date by the game events
+        this.board = Array.from({ length: rowNumber }, () => new Array(colNumber).fill(0));
         this.offset = this.radius;
         this.centers = this.calculateCenters();
 
@@ -13,7 +16,6 @@ class HexagonGame {
         this.setCanvasSize();
 
         this.canvas.addEventListener('click', this.handleClick.bind(this), false);
-        this.updateInterval = setInterval(this.update.bind(this), 100);
     }
 
     // REQUEST
@@ -131,6 +133,52 @@ class HexagonGame {
         this.canvas.height = 2 * this.radius * this.rowNumber - ((this.rowNumber - 1) * (lossH - 1)) + this.offset * 1.5;
     }
 
+    drawStones() {
+        this.drawBoard();
+        for (let i = 0; i < this.rowNumber; i++) {
+            for (let j = 0; j < this.colNumber; j++) {
+                if (this.board[i][j] === 1) {
+                    this.drawCircle(i, j, 'red');
+                }
+                else if (this.board[i][j] === 2) {
+                    this.drawCircle(i, j, 'blue');
+                }
+            }
+        }
+    }
+
+    setLoading(visible) {
+        var loading = document.getElementById("game-information");
+        loading.style.opacity = visible ? 1 : 0;
+        loading.style.visibility = visible ? "visible" : "hidden";
+        if (!visible) {
+            displaySearchProgress(null);
+        }
+    }
+
+    // Apply a change of the game sent by Python, one per move
+    applyEvent(event) {
+        switch (event.event) {
+            case "move":
+                this.board[event.cell[0]][event.cell[1]] = event.player;
+                break;
+            case "undo":
+                this.board[event.cell[0]][event.cell[1]] = 0;
+                break;
+            case "reset":
+                this.board = this.board.map(row => row.map(() => 0));
+                break;
+        }
+        let wasOver = this.over;
+        this.over = event.winner !== null;
+        this.currentPlayer = event.current_player;
+        this.setLoading(!event.human && !this.over);
+        this.drawStones();
+        if (this.over && !wasOver) {
+            swal("Game Over", event.winner + " wins!", "success");
+        }
+    }
+
     drawCircle(row, col, color) {
         this.ctx.beginPath();
         // Border
@@ -161,17 +209,8 @@ class HexagonGame {
         return centers;
     }
 
-    async checkGameOver() {
-        if (this.over) {
-            return true;
-        } else {
-            this.over = await eel.eel_is_game_over()();
-        }
-        return this.over;
-    }
-
     async handleClick(event) {
-        if (await this.checkGameOver()) {
+        if (this.over) {
             console.log("Game Over");
             return;
         }
@@ -186,69 +225,52 @@ class HexagonGame {
             return;
         }
 
-        var current_player = await eel.eel_get_current_player()();
-
-        eel.eel_set_player_move(current_player, row, col)();
+        // The board is drawn again when the move event comes back
+        await eel.eel_set_player_move(this.currentPlayer, row, col)();
         eel.eel_update_game()();
-
-        displayBoard(this);
     }
+}
 
-    // update function update every 1s
-    async update() {
-        // Check for loading animation and activate it if the current player is not human
-        var loading = document.getElementById("game-information");
+let hexagonGame = null;
 
-        let is_human = await eel.eel_is_current_player_human()();
-        if (is_human) {
-            loading.style.opacity = 0;
-            loading.style.visibility = "hidden";
-        } else {
-            loading.style.opacity = 1;
-            loading.style.visibility = "visible";
-        }
-        if (await this.checkGameOver()) {
-            swal("Game Over", await eel.eel_get_winner()() + " wins!", "success");
-            clearInterval(this.updateInterval);
-            return;
-        }
-        var current_player = await eel.eel_is_current_player_human()();
-        if (current_player == false) {
-            eel.eel_update_game()();
-        }
-        displayBoard(this);
+eel.expose(applyGameEvent, "apply_game_event");
+function applyGameEvent(event) {
+    if (hexagonGame) {
+        hexagonGame.applyEvent(event);
     }
 }
 
-async function displayBoard(hexagonGame) {
-    var board = await eel.eel_get_board()();
-    hexagonGame.drawBoard();
-    for (let i = 0; i < board.length; i++) {
-        for (let j = 0; j < board[0].length; j++) {
-            if (board[i][j] === 1) {
-                hexagonGame.drawCircle(i, j, 'red');
-            }
-            else if (board[i][j] === 2) {
-                hexagonGame.drawCircle(i, j, 'blue');
-            }
+eel.expose(displaySearchProgress, "display_search_progress");
+function displaySearchProgress(progress) {
+    let text = "";
+    if (progress) {
+        text = Math.round(progress.nodes_per_sec) + " nœuds/s";
+        if (progress.depth > 0 && progress.best_move) {
+            // Same notation as the board, letter for the column and number for the row
+            let move = String.fromCharCode(65 + progress.best_move[1]) + (progress.best_move[0] + 1);
+            text = "Profondeur " + progress.depth + " · " + move + " · " + text;
         }
     }
+    document.getElementById("search-progress").textContent = text;
 }
 
 async function main() {
     var hexagonRadius = 30;
     var board = await eel.eel_get_board()();
 
-    const hexagonGame = new HexagonGame(board.length, board[0].length, hexagonRadius);
-
-    displayBoard(hexagonGame);
+    hexagonGame = new HexagonGame(board.length, board[0].length, hexagonRadius);
+    // The state once at load, the changes are then sent by Python
+    hexagonGame.board = board;
+    hexagonGame.over = await eel.eel_is_game_over()();
+    hexagonGame.currentPlayer = await eel.eel_get_current_player()();
+    hexagonGame.setLoading(!hexagonGame.over && !(await eel.eel_is_current_player_human()()));
+    hexagonGame.drawStones();
 }
 
 main();
 
 async function reset() {
     eel.eel_reset_game()();
-    main();
 }
 
 async function undo() {
@@ -1,8 +1,16 @@
-from ..utils.heuristics_func import Heuristic, evaluate
-from ..game.game import Game, PlayerOrder
+from ..utils.iterative_deepening import Deadline, iterative_deepening
+from ..utils.move_ordering import MoveOrdering
+from ..utils.parallel_search import ParallelRootSearch
+from ..utils.transposition_table import TranspositionTable, Flag
+from ..utils.two_distance_tracker import incremental_two_distance
+from ..utils.resistance_tracker import incremental_resistance
+from ..utils.heuristics_func import WIN_VALUE, Heuristic, evaluate, match_heuristic
+from ..utils.virtual_connections import VirtualAnalysis, analyze, filter_mustplay
+from ..game.game import Game, PlayerOrder, MOVE_TYPE
 from .manager import Manager
 from ..config import Config
-from typing import Optional
+from typing import Iterator, Optional
+from contextlib import contextmanager
 
 
 class AlphaBetaManager(Manager):
@@ -10,63 +18,219 @@ class AlphaBetaManager(Manager):
     def __init__(self, config: Config, depth: int) -> None:
         super().__init__(config)
         self.depth = depth
+        self.transposition_table: Optional[TranspositionTable] = None
+        if config.search.transposition_size_mb > 0:
+            self.transposition_table = TranspositionTable(config.search.transposition_size_mb)
+        self.deadline: Optional[Deadline] = None
+        self.heuristic = match_heuristic(config.search.heuristic)
+        self.move_ordering = MoveOrdering(config.search.move_ordering)
+        # Virtual connection analyses of the positions of the current search
+        self.virtual_analyses: dict[int, VirtualAnalysis] = {}
+        self.root_ply: Optional[int] = None
+        self.parallel_search: Optional[ParallelRootSearch] = None
+        if config.search.workers > 1:
+            self.parallel_search = ParallelRootSearch(type(self), config, depth, config.search.workers)
         if depth < 1:
             raise ValueError("AlphaBeta depth should be at least 1")
 
     def reset(self) -> None:
         """Reset the manager"""
-        pass
+        if self.transposition_table:
+            self.transposition_table.clear()
+        self.move_ordering.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes of the parallel search, if any"""
+        if self.parallel_search:
+            self.parallel_search.shutdown(wait)
 
     def check_for_winning_move(self, game: Game) -> Optional[tuple[int, int]]:
         """Check if there is a winning move in the current game state"""
         for move in game.get_valid_moves(game.get_current_player()):
-            game_copy = game.copy()
-            game_copy.move(move)
-            if game_copy.is_over():
+            game.push_move(move)
+            over = game.is_over()
+            game.pop_move()
+            if over:
                 return move
         return None
 
+    def get_virtual_analysis(self, game: Game, depth: int) -> Optional[VirtualAnalysis]:
+        """Return the virtual connections of the position if they are searched at this depth"""
+        if not self.config.search.virtual_connections or depth < self.config.search.virtual_connections_depth:
+            return None
+        key = game.get_zobrist_key()
+        analysis = self.virtual_analyses.get(key)
+        if analysis is None:
+            analysis = analyze(game)
+            self.virtual_analyses[key] = analysis
+        return analysis
+
+    def get_virtual_value(self, game: Game, depth: int, player: PlayerOrder) -> Optional[float]:
+        """Return the value for player of a virtual win found below the root, None if there is none"""
+        if len(game.get_move_history()) == self.root_ply:
+            return None
+        analysis = self.get_virtual_analysis(game, depth)
+        if analysis is None or analysis.winner is None:
+            return None
+        return WIN_VALUE if analysis.winner == player else -WIN_VALUE
+
+    @contextmanager
+    def track_evaluation(self, game: Game) -> Iterator[None]:
+        """Attach the tracker of the heuristic to the game for the duration of a search"""
+        with (
+            incremental_two_distance(
+                game, self.config.search.incremental_evaluation and self.heuristic == Heuristic.TWO_DISTANCE
+            ),
+            incremental_resistance(game, self.heuristic == Heuristic.RESISTANCE),
+        ):
+            yield
+
+    def order_moves(self, game: Game, first_move: Optional[MOVE_TYPE] = None, tt_move: Optional[MOVE_TYPE] = None, depth: int = 0) -> list[MOVE_TYPE]:
+        """Return the moves to search ordered by the strategies, first_move first if given.
+
+        The moves are restricted to the mustplay region when the virtual
+        connections are searched at depth. With the resistance tracker, the
+        children of a node at depth 1 are sorted by their batched values.
+        """
+        player = game.get_current_player()
+        ply = len(game.get_move_history()) - self.root_ply
+        moves = self.move_ordering.order(game.get_turbo_valid_moves(player), ply, player, tt_move)
+        analysis = self.get_virtual_analysis(game, depth)
+        if analysis:
+            moves = filter_mustplay(moves, analysis.mustplay, game.get_size()[1])
+        if depth == 1:
+            # The children are leaves, solve them in one batch and search the best first
+            tracker = game.get_tracker(Heuristic.RESISTANCE.value)
+            if tracker:
+                values = tracker.evaluate_moves(moves, player)
+                moves = [move for _, move in sorted(zip(values, moves), key=lambda item: -item[0])]
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
+
+    def add_cutoff(self, game: Game, move: MOVE_TYPE, index: int, depth: int) -> None:
+        """Record the beta cutoff of the move for the ordering of the next nodes"""
+        self.move_ordering.add_cutoff(
+            move, index, depth, len(game.get_move_history()) - self.root_ply, game.get_current_player()
+        )
+
     def get_move(self, game: Game) -> Optional[tuple[int, int]]:
         """Return the best move using the alpha beta algorithm"""
-        return self.alphabeta(
-            game, self.depth, float('-inf'), float('inf'),
-            True, game.get_current_player()
-        )[1]
+        self.root_ply = len(game.get_move_history())
+        self.virtual_analyses = {}
+        if self.parallel_search and self.config.search.time_budget_ms == 0:
+            _, move, nodes = self.parallel_search.search(
+                game, self.order_moves(game, depth=self.depth), self.check_cancelled
+            )
+            self.nodes += nodes
+            return move
+        if self.transposition_table:
+            self.transposition_table.new_search()
+        self.move_ordering.new_search()
+        with self.track_evaluation(game):
+            player = game.get_current_player()
+            if self.config.search.time_budget_ms > 0:
+                self.deadline = Deadline(self.config.search.time_budget_ms)
+                _, move, _ = iterative_deepening(
+                    game,
+                    lambda depth, first_move: self.alphabeta(
+                        game, depth, float('-inf'), float('inf'), True, player, first_move
+                    ),
+                    self.deadline,
+                )
+                self.deadline = None
+                return move
+            return self.alphabeta(
+                game, self.depth, float('-inf'), float('inf'),
+                True, player
+            )[1]
 
-    def alphabeta(self, game: Game, depth: int, alpha: float, beta: float, maximizing_player: bool, player: PlayerOrder) -> tuple[float, Optional[tuple[int, int]]]:
-        """Alpha-beta pruning algorithm"""
+    def search_root_move(self, game: Game, move: MOVE_TYPE, depth: int, alpha: float, player: PlayerOrder) -> float:
+        """Return the value of a root move, exact if it is greater than alpha"""
+        if self.root_ply != len(game.get_move_history()):
+            self.root_ply = len(game.get_move_history())
+            self.virtual_analyses = {}
+            self.move_ordering.new_search()
+        with self.track_evaluation(game):
+            game.push_move(move)
+            value, _ = self.alphabeta(game, depth - 1, alpha, float('inf'), False, player)
+            game.pop_move()
+        return value
+
+    def alphabeta(self, game: Game, depth: int, alpha: float, beta: float, maximizing_player: bool, player: PlayerOrder, first_move: Optional[MOVE_TYPE] = None) -> tuple[float, Optional[tuple[int, int]]]:
+        """Alpha-beta pruning algorithm, first_move is searched first if given"""
+        self.nodes += 1
+        if self.deadline:
+            self.deadline.check()
+        self.check_cancelled()
         if depth == 0 or game.is_over():
-            return evaluate(game, player, Heuristic.TWO_DISTANCE) + depth, None
+            return evaluate(game, player, self.heuristic) + depth, None
+        virtual_value = self.get_virtual_value(game, depth, player)
+        if virtual_value is not None:
+            return virtual_value, None
+
+        # Values are stored from the point of view of player, for both min and max nodes
+        alpha_original, beta_original = alpha, beta
+        key = game.get_zobrist_key()
+        tt_move = None
+        if self.transposition_table:
+            tt_entry = self.transposition_table.probe(key)
+            tt_move = tt_entry[3] if tt_entry else None
+            if tt_entry and tt_entry[2] >= depth:
+                tt_value, tt_flag, _, tt_move = tt_entry
+                if tt_flag == Flag.EXACT:
+                    return tt_value, tt_move
+                elif tt_flag == Flag.LOWERBOUND:
+                    alpha = max(alpha, tt_value)
+                elif tt_flag == Flag.UPPERBOUND:
+                    beta = min(beta, tt_value)
+                if alpha >= beta:
+                    return tt_value, tt_move
 
         best_move = None
+        moves = self.order_moves(game, first_move, tt_move, depth)
 
         if maximizing_player:
             value = float('-inf')
-            for move in game.get_turbo_valid_moves(game.get_current_player()):
-                game_copy = game.copy()
-                game_copy.move(move)
+            for index, move in enumerate(moves):
+                game.push_move(move)
                 move_value, _ = self.alphabeta(
-                    game_copy, depth - 1, alpha, beta, False, player
+                    game, depth - 1, alpha, beta, False, player
                 )
+                game.pop_move()
                 if move_value > value:
                     value = move_value
                     best_move = move
+                    if len(game.get_move_history()) == self.root_ply:
+                        self.report_progress(depth, move)
                 alpha = max(alpha, value)
                 if value >= beta:
+                    self.add_cutoff(game, move, index, depth)
                     break
         else:
             value = float('inf')
-            for move in game.get_turbo_valid_moves(game.get_current_player()):
-                game_copy = game.copy()
-                game_copy.move(move)
+            for index, move in enumerate(moves):
+                game.push_move(move)
                 move_value, _ = self.alphabeta(
-                    game_copy, depth - 1, alpha, beta, True, player
+                    game, depth - 1, alpha, beta, True, player
                 )
+                game.pop_move()
                 if move_value < value:
                     value = move_value
                     best_move = move
                 beta = min(beta, value)
                 if value <= alpha:
+                    self.add_cutoff(game, move, index, depth)
                     break
 
+        if self.transposition_table:
+            if value <= alpha_original:
+                flag = Flag.UPPERBOUND
+            elif value >= beta_original:
+                flag = Flag.LOWERBOUND
+            else:
+                flag = Flag.EXACT
+            self.transposition_table.store(key, value, flag, depth, best_move)
+
         return value, best_move
@@ -0,0 +1,76 @@
+from ..utils.beam_node import BeamNode
+from ..game.game import Game
+from .manager import Manager
+from typing import Optional
+from ..config import Config
+import heapq
+
+
+class BeamManager(Manager):
+    """Search depth plies keeping only the best beam width states of each ply.
+
+    Each player keeps the states best for them, the values of the kept
+    states are then backed up with minimax. Only the states searched to the
+    full depth, or to the end of the game, are backed up, so that the values
+    compared come from the same ply. The cost grows linearly with the depth.
+    """
+
+    def __init__(self, config: Config, depth: int) -> None:
+        super().__init__(config)
+        self.depth = depth
+        self.width = config.beam.width
+        if depth < 1:
+            raise ValueError("Beam search depth should be at least 1")
+        if self.width < 1:
+            raise ValueError("Beam width should be at least 1")
+
+    def reset(self) -> None:
+        """Reset the manager"""
+        pass
+
+    def get_move(self, game: Game) -> Optional[tuple[int, int]]:
+        """Return the first move of the best line kept by the beam"""
+        if game.is_over():
+            return None
+        return self.get_best_child(self.search(game)).move
+
+    @staticmethod
+    def get_best_child(root: BeamNode) -> BeamNode:
+        """Return the child of the root with the best value, among the complete ones if any"""
+        children = [child for child in root.children if child.complete] or root.children
+        return max(children, key=lambda node: node.value)
+
+    def search(self, game: Game) -> BeamNode:
+        """Return the root of the tree kept by the beam, with the backed up values"""
+        player = game.get_current_player()
+        root = BeamNode(None, 0)
+        levels = [[root]]
+        for ply in range(self.depth):
+            candidates = []
+            for node in levels[-1]:
+                self.check_cancelled()
+                moves = node.get_moves()
+                for move in moves:
+                    game.push_move(move)
+                if game.is_over():
+                    node.complete = True
+                else:
+                    candidates.extend(node.expand(game, player))
+                for _ in moves:
+                    game.pop_move()
+            if not candidates:
+                break
+            self.nodes += len(candidates)
+
+            sign = 1 if ply % 2 == 0 else -1
+            beam = heapq.nlargest(self.width, candidates, key=lambda node: sign * node.value)
+            for node in beam:
+                node.parent.children.append(node)
+            levels.append(beam)
+
+        for node in levels[-1]:
+            node.complete = True
+        for ply in range(len(levels) - 2, -1, -1):
+            for node in levels[ply]:
+                node.backup(ply % 2 == 0)
+        return root
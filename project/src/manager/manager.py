@@ -4,11 +4,22 @@ from typing import Optional
 from ..config import Config
 
 
+class SearchCancelled(Exception):
+    """Raised from inside a search when it is cancelled from another thread"""
+
+
 class Manager(ABC):
 
     def __init__(self, config: Config) -> None:
         super().__init__()
         self.config = config
+        # Number of positions visited by the searches of the manager
+        self.nodes = 0
+        # Set from another thread to stop the current search, see SearchJob
+        self.cancelled = False
+        # Depth and best root move of the current search, for the progress reports
+        self.progress_depth = 0
+        self.progress_move: Optional[tuple[int, int]] = None
 
     @abstractmethod
     def get_move(self, game: Game) -> Optional[tuple[int, int]]:
@@ -19,3 +30,17 @@ class Manager(ABC):
     def reset(self) -> None:
         """Reset the manager"""
         return NotImplemented
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes of the manager, if any"""
+        pass
+
+    def check_cancelled(self) -> None:
+        """Raise SearchCancelled if the current search was cancelled"""
+        if self.cancelled:
+            raise SearchCancelled()
+
+    def report_progress(self, depth: int, move: Optional[tuple[int, int]]) -> None:
+        """Record the best root move found so far by a search of the depth"""
+        self.progress_depth = depth
+        self.progress_move = move
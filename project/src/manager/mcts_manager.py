@@ -0,0 +1,143 @@
+from ..utils.playout import EMPTY, PLAYER1, PLAYER2, PlayoutTables, get_cells, get_playout_tables, random_playout
+from ..game.game import Game, MOVE_TYPE
+from ..utils.mcts_node import MCTSNode
+from .manager import Manager
+from typing import Optional
+from ..config import Config
+from random import shuffle
+import time
+
+# Playouts between two checks of the time limit
+TIME_CHECK_INTERVAL = 64
+
+
+class MCTSManager(Manager):
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        if config.mcts.playouts < 1 and config.mcts.time_limit_ms <= 0:
+            raise ValueError("MCTS needs a playout budget or a time limit")
+        self.root: Optional[MCTSNode] = None
+        # Moves leading to the root, to find it again in the next position
+        self.root_history: list[MOVE_TYPE] = []
+
+    def reset(self) -> None:
+        """Reset the manager"""
+        self.root = None
+        self.root_history = []
+
+    def get_move(self, game: Game) -> Optional[tuple[int, int]]:
+        """Return the most visited move after the playouts"""
+        if game.is_over():
+            return None
+        width, height = game.get_size()
+        tables = get_playout_tables(width, height)
+        cells = get_cells(game)
+        root = self.get_root(game)
+        self.nodes += self.search(root, cells, tables, self.config.mcts.playouts, self.config.mcts.time_limit_ms)
+
+        best = root.get_most_visited_child()
+        if best is None:
+            return None
+        move = divmod(best.move, height)
+        if self.config.mcts.reuse_tree:
+            best.parent = None
+            self.root = best
+            self.root_history = [record.move for record in game.get_move_history()] + [move]
+        return move
+
+    def get_root(self, game: Game) -> MCTSNode:
+        """Return the kept subtree of the position if there is one, else a new root"""
+        player = game.get_current_player().value
+        opponent = PLAYER2 if player == PLAYER1 else PLAYER1
+        history = [record.move for record in game.get_move_history()]
+        root = self.root
+        if root is None or history[:len(self.root_history)] != self.root_history:
+            return MCTSNode(None, opponent)
+
+        height = game.get_size()[1]
+        for x, y in history[len(self.root_history):]:
+            root = root.get_child(x * height + y)
+            if root is None:
+                return MCTSNode(None, opponent)
+        # A passed turn changes the player to move without a move
+        if root.player != opponent:
+            return MCTSNode(None, opponent)
+        root.parent = None
+        return root
+
+    def search(self, root: MCTSNode, cells: list[int], tables: PlayoutTables, playouts: int, time_limit_ms: int) -> int:
+        """Run playouts from the root until the time limit, or the playout budget if there is none.
+
+        Return the number of playouts.
+        """
+        exploration = self.config.mcts.exploration
+        rave_equivalence = self.get_rave_equivalence()
+        time_limit = time_limit_ms / 1000
+        end = time.perf_counter() + time_limit
+        count = 0
+        while True:
+            self.check_cancelled()
+            if time_limit > 0:
+                if count % TIME_CHECK_INTERVAL == 0 and time.perf_counter() >= end:
+                    break
+            elif count >= playouts:
+                break
+            leaf_cells = cells.copy()
+            leaf = self.select_leaf(root, leaf_cells, tables, exploration, rave_equivalence)
+            to_move = PLAYER2 if leaf.player == PLAYER1 else PLAYER1
+            winner = random_playout(leaf_cells, to_move, tables)
+            self.backpropagate(leaf, leaf_cells, winner, rave_equivalence)
+            count += 1
+        return count
+
+    def get_rave_equivalence(self) -> float:
+        """Return the RAVE equivalence of the config, 0 if RAVE is disabled"""
+        return self.config.mcts.rave_equivalence if self.config.mcts.rave else 0
+
+    @staticmethod
+    def select_leaf(root: MCTSNode, cells: list[int], tables: PlayoutTables, exploration: float, rave_equivalence: float, virtual_loss: bool = False) -> MCTSNode:
+        """Walk down the tree from the root and expand one child, playing the moves on cells.
+
+        With virtual_loss, the visits of the path are counted right away so
+        that the next selections, made before the playout ends, spread out.
+        """
+        node = root
+        while True:
+            if virtual_loss:
+                node.visits += 1
+            if node.untried is None:
+                node.untried = [cell for cell in range(tables.size) if cells[cell] == EMPTY]
+                shuffle(node.untried)
+            if node.untried:
+                move = node.untried.pop()
+                player = PLAYER2 if node.player == PLAYER1 else PLAYER1
+                child = MCTSNode(move, player, node)
+                node.children.append(child)
+                cells[move] = player
+                if virtual_loss:
+                    child.visits += 1
+                return child
+            if not node.children:
+                return node
+            node = node.select_child(exploration, rave_equivalence)
+            cells[node.move] = node.player
+
+    @staticmethod
+    def backpropagate(node: MCTSNode, cells: list[int], winner: int, rave_equivalence: float, visited: bool = False) -> None:
+        """Count the playout on the path from node to the root, visited if the visits were already counted"""
+        while node is not None:
+            if not visited:
+                node.visits += 1
+            if winner == node.player:
+                node.wins += 1
+            if rave_equivalence:
+                # Every move the player to move played in the playout counts for its child
+                to_move = PLAYER2 if node.player == PLAYER1 else PLAYER1
+                won = winner == to_move
+                for child in node.children:
+                    if cells[child.move] == to_move:
+                        child.amaf_visits += 1
+                        if won:
+                            child.amaf_wins += 1
+            node = node.parent
@@ -1,7 +1,11 @@
-from ..utils.heuristics_func import Heuristic, evaluate
+from ..utils.transposition_table import TranspositionTable, Flag
+from ..utils.two_distance_tracker import incremental_two_distance
+from ..utils.resistance_tracker import incremental_resistance
+from ..utils.heuristics_func import Heuristic, evaluate, match_heuristic
 from ..game.game import Game, PlayerOrder
 from .manager import Manager
-from typing import Optional
+from typing import Iterator, Optional
+from contextlib import contextmanager
 from ..config import Config
 
 
@@ -10,47 +14,78 @@ class MinimaxManager(Manager):
     def __init__(self, config: Config, depth: int) -> None:
         super().__init__(config)
         self.depth = depth
+        self.transposition_table: Optional[TranspositionTable] = None
+        if config.search.transposition_size_mb > 0:
+            self.transposition_table = TranspositionTable(config.search.transposition_size_mb)
+        self.heuristic = match_heuristic(config.search.heuristic)
         if depth < 1:
             raise ValueError("Minimax depth should be at least 1")
 
     def reset(self) -> None:
         """Reset the manager"""
-        pass
+        if self.transposition_table:
+            self.transposition_table.clear()
+
+    @contextmanager
+    def track_evaluation(self, game: Game) -> Iterator[None]:
+        """Attach the tracker of the heuristic to the game for the duration of a search"""
+        with (
+            incremental_two_distance(
+                game, self.config.search.incremental_evaluation and self.heuristic == Heuristic.TWO_DISTANCE
+            ),
+            incremental_resistance(game, self.heuristic == Heuristic.RESISTANCE),
+        ):
+            yield
 
     def get_move(self, game: Game) -> Optional[tuple[int, int]]:
         """Return the best move using the minimax algorithm"""
-        return self.minimax(
-            game, self.depth, True, game.get_current_player()
-        )[1]
+        if self.transposition_table:
+            self.transposition_table.new_search()
+        with self.track_evaluation(game):
+            return self.minimax(
+                game, self.depth, True, game.get_current_player()
+            )[1]
 
     def minimax(self, game: Game, depth: int, maximizing_player: bool, player: PlayerOrder) -> tuple[float, Optional[tuple[int, int]]]:
         """Minimax algorithm"""
+        self.nodes += 1
+        self.check_cancelled()
         if depth == 0 or game.is_over():
-            return evaluate(game, player, Heuristic.TWO_DISTANCE), None
+            return evaluate(game, player, self.heuristic), None
+
+        # Minimax values are always exact
+        key = game.get_zobrist_key()
+        if self.transposition_table:
+            tt_entry = self.transposition_table.probe(key)
+            if tt_entry and tt_entry[2] >= depth:
+                return tt_entry[0], tt_entry[3]
 
         best_move = None
 
         if maximizing_player:
             value = float('-inf')
             for move in game.get_turbo_valid_moves(game.get_current_player()):
-                game_copy = game.copy()
-                game_copy.move(move)
+                game.push_move(move)
                 move_value, _ = self.minimax(
-                    game_copy, depth - 1, False, player
+                    game, depth - 1, False, player
                 )
+                game.pop_move()
                 if move_value > value:
                     value = move_value
                     best_move = move
         else:
             value = float('inf')
             for move in game.get_turbo_valid_moves(game.get_current_player()):
-                game_copy = game.copy()
-                game_copy.move(move)
+                game.push_move(move)
                 move_value, _ = self.minimax(
-                    game_copy, depth - 1, True, player
+                    game, depth - 1, True, player
                 )
+                game.pop_move()
                 if move_value < value:
                     value = move_value
                     best_move = move
 
+        if self.transposition_table:
+            self.transposition_table.store(key, value, Flag.EXACT, depth, best_move)
+
         return value, best_move
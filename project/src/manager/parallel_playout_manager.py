@@ -0,0 +1,168 @@
+from __future__ import annotations
+from ..utils.playout import PLAYER1, PLAYER2, get_cells, get_playout_tables, random_playout
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from ..game.game import Game
+from ..utils.mcts_node import MCTSNode
+from .mcts_manager import MCTSManager
+from collections import Counter
+from ..utils.parallel_search import CANCEL_CHECK_INTERVAL
+from .manager import Manager, SearchCancelled
+from typing import Optional
+from ..config import Config
+from enum import Enum
+import random
+import time
+import os
+
+# Leaves sent to a worker at once in the virtual loss mode
+LEAVES_PER_TASK = 32
+
+
+class ParallelMode(Enum):
+    """Enum for the ways the workers share the search"""
+    # Each worker grows its own tree, the root visits are summed at the end
+    ROOT = "root"
+    # One tree in the main process, the workers run the playouts of its leaves
+    VIRTUAL_LOSS = "virtual_loss"
+
+
+def seed_worker(seed: int) -> None:
+    """Give each worker process its own random sequence"""
+    random.seed(seed ^ os.getpid())
+
+
+def search_tree(config: Config, cells: list[int], player: int, width: int, height: int, playouts: int, time_limit_ms: int) -> tuple[dict[int, int], int]:
+    """Grow a tree from the position where player just played.
+
+    Return the visits of the moves of the root and the number of playouts.
+    """
+    root = MCTSNode(None, player)
+    count = MCTSManager(config).search(root, cells, get_playout_tables(width, height), playouts, time_limit_ms)
+    return {child.move: child.visits for child in root.children}, count
+
+
+def run_playouts(leaves: list[tuple[bytes, int]], width: int, height: int) -> list[tuple[int, bytes]]:
+    """Play out each (cells, player to move) leaf and return its winner and filled cells"""
+    tables = get_playout_tables(width, height)
+    results = []
+    for leaf_cells, to_move in leaves:
+        cells = list(leaf_cells)
+        winner = random_playout(cells, to_move, tables)
+        results.append((winner, bytes(cells)))
+    return results
+
+
+class ParallelPlayoutManager(Manager):
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config)
+        if config.mcts.playouts < 1 and config.mcts.time_limit_ms <= 0:
+            raise ValueError("Parallel playout needs a playout budget or a time limit")
+        self.mode = ParallelMode(config.user.parallel_playout_mode)
+        self.workers = config.mcts.workers or os.cpu_count() or 1
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def reset(self) -> None:
+        """Reset the manager"""
+        pass
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """Return the worker pool, started on first use"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=seed_worker,
+                initargs=(random.getrandbits(32),),
+            )
+        return self.executor
+
+    def get_move(self, game: Game) -> Optional[tuple[int, int]]:
+        """Return the most visited move over the playouts of all the workers"""
+        if game.is_over():
+            return None
+        cells = get_cells(game)
+        player = PLAYER2 if game.get_current_player().value == PLAYER1 else PLAYER1
+        try:
+            if self.mode == ParallelMode.ROOT:
+                visits = self.search_root_parallel(game, cells, player)
+            else:
+                visits = self.search_virtual_loss(game, cells, player)
+        except SearchCancelled:
+            # The workers would finish the tasks of the cancelled search before the next one
+            self.shutdown(wait=False)
+            raise
+        if not visits:
+            return None
+        return divmod(max(visits, key=visits.get), game.get_size()[1])
+
+    def search_root_parallel(self, game: Game, cells: list[int], player: int) -> Counter:
+        """Grow one tree per worker, the playout budget is split between them"""
+        width, height = game.get_size()
+        playouts = -(-self.config.mcts.playouts // self.workers)
+        futures = [
+            self.get_executor().submit(
+                search_tree, self.config, cells, player, width, height,
+                playouts, self.config.mcts.time_limit_ms
+            )
+            for _ in range(self.workers)
+        ]
+        pending = set(futures)
+        while pending:
+            self.check_cancelled()
+            _, pending = wait(pending, timeout=CANCEL_CHECK_INTERVAL)
+        visits = Counter()
+        for future in futures:
+            worker_visits, count = future.result()
+            visits.update(worker_visits)
+            self.nodes += count
+        return visits
+
+    def search_virtual_loss(self, game: Game, cells: list[int], player: int) -> dict[int, int]:
+        """Grow one tree, sending batches of leaves to the workers as soon as one is free"""
+        width, height = game.get_size()
+        tables = get_playout_tables(width, height)
+        exploration = self.config.mcts.exploration
+        rave_equivalence = self.config.mcts.rave_equivalence if self.config.mcts.rave else 0
+        time_limit = self.config.mcts.time_limit_ms / 1000
+        end = time.perf_counter() + time_limit
+        root = MCTSNode(None, player)
+        executor = self.get_executor()
+
+        pending: dict[Future, list[MCTSNode]] = {}
+        started = 0
+
+        def submit() -> None:
+            nonlocal started
+            leaves, batch = [], []
+            for _ in range(LEAVES_PER_TASK):
+                leaf_cells = cells.copy()
+                leaf = MCTSManager.select_leaf(root, leaf_cells, tables, exploration, rave_equivalence, True)
+                leaves.append(leaf)
+                batch.append((bytes(leaf_cells), PLAYER2 if leaf.player == PLAYER1 else PLAYER1))
+            pending[executor.submit(run_playouts, batch, width, height)] = leaves
+            started += LEAVES_PER_TASK
+
+        def has_budget() -> bool:
+            if time_limit > 0:
+                return time.perf_counter() < end
+            return started < self.config.mcts.playouts
+
+        for _ in range(self.workers):
+            if has_budget():
+                submit()
+        while pending:
+            self.check_cancelled()
+            done, _ = wait(pending, timeout=CANCEL_CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                for leaf, (winner, leaf_cells) in zip(pending.pop(future), future.result()):
+                    MCTSManager.backpropagate(leaf, leaf_cells, winner, rave_equivalence, visited=True)
+                self.nodes += LEAVES_PER_TASK
+                if has_budget():
+                    submit()
+        return {child.move: child.visits for child in root.children}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes, without waiting for their current tasks if wait is False"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
@@ -1,30 +1,24 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
 from typing import Optional, Tuple
-from queue import PriorityQueue
-from ..utils.node import Node
+from itertools import count
 from enum import Enum
+import heapq
 
-from ..utils.heuristics_func import Heuristic, evaluate
+from ..utils.heuristics_func import WIN_VALUE, Heuristic, evaluate
+from ..utils.sss_node import SSSNode, get_path
 from ..game.game import Game, PlayerOrder
-from ..utils.node import Node
 from .manager import Manager
 from ..config import Config
 
+# Above any value of the search
+HIGH_VALUE = 2 * WIN_VALUE
+
 
 class State(Enum):
     LIVE = 1
     SOLVE = 2
 
 
-@dataclass(order=True)
-class PriorityQueueItem:
-    priority: float
-    node: Node = field(compare=False)
-    state: State = field(compare=False)
-    best_move: Optional[Tuple[int, int]] = field(compare=False)
-
-
 class SSSManager(Manager):
     def __init__(self, config: Config, depth: int) -> None:
         super().__init__(config)
@@ -39,9 +33,10 @@ class SSSManager(Manager):
     def check_for_winning_move(self, game: Game) -> Optional[tuple[int, int]]:
         """Check if there is a winning move in the current game state"""
         for move in game.get_valid_moves(game.get_current_player()):
-            game_copy = game.copy()
-            game_copy.move(move)
-            if game_copy.is_over():
+            game.push_move(move)
+            over = game.is_over()
+            game.pop_move()
+            if over:
                 return move
         return None
 
@@ -53,41 +48,91 @@ class SSSManager(Manager):
         return move
 
     def sss_star(self, game: Game, depth: int, player: PlayerOrder) -> Tuple[float, Optional[Tuple[int, int]]]:
-        """SSS* algorithm"""
-        high_value = 1000
-        root = Node(game, depth=depth)
-        pq = PriorityQueue()
-        pq.put(PriorityQueueItem(-high_value, root, State.LIVE, None))
-
-        while not pq.empty():
-            item = pq.get()
-            h, node, state, best_move = item.priority, item.node, item.state, item.best_move
-            if node.stale:
-                continue
-            if node == root and state == State.SOLVE:
-                return -h, best_move
-            if state == State.LIVE:
-                if node.is_leaf():
-                    evaluation = -(evaluate(node.get_game(), player, Heuristic.TWO_DISTANCE) + node.depth)
-                    pq.put(PriorityQueueItem(max(evaluation, h), node, State.SOLVE, None))
-                elif node.game.get_current_player() == player:
-                    for child in node.expand():
-                        pq.put(PriorityQueueItem(h, child, State.LIVE, None))
-                else:
-                    node.expand()
-                    pq.put(PriorityQueueItem(h, node.children.pop(), State.LIVE, None))
-            else:
-                if node.game.get_current_player() != player:
-                    pq.put(PriorityQueueItem(h, node.parent, State.SOLVE, node.last_move))
-                    for child in node.parent.children:
-                        child.stale = True
+        """SSS* algorithm.
+
+        The open list is a heap of (-value, sequence, node index, state,
+        best move) tuples, the decreasing sequence pops the last pushed of
+        equal values first, which goes deep before wide. The MAX nodes are
+        at even depths, the player to move can not tell them apart at a
+        game over. The nodes only
+        hold their move, the game is moved to the popped node with
+        push_move / pop_move and restored before returning.
+        """
+        nodes = [SSSNode(None, -1)]
+        # MAX nodes already solved, the entries below them are stale
+        solved: set[int] = set()
+        sequence = count()
+        heap = [(-HIGH_VALUE, -next(sequence), 0, State.LIVE, None)]
+        # Indexes of the nodes whose moves are pushed on the game
+        path: list[int] = []
+
+        try:
+            while heap:
+                priority, _, index, state, best_move = heapq.heappop(heap)
+                if self.is_stale(nodes, index, solved):
+                    continue
+                self.nodes += 1
+                self.check_cancelled()
+                h = -priority
+                if index == 0 and state == State.SOLVE:
+                    return h, best_move
+                self.move_to(game, nodes, path, index)
+                parent = nodes[index].parent
+
+                if state == State.LIVE:
+                    if len(path) == depth or game.is_over():
+                        evaluation = evaluate(game, player, Heuristic.TWO_DISTANCE) + depth - len(path)
+                        heapq.heappush(heap, (-min(evaluation, h), -next(sequence), index, State.SOLVE, None))
+                    elif len(path) % 2 == 0:
+                        # Reversed so that the moves near the center are popped first
+                        for move in reversed(game.get_turbo_valid_moves(player)):
+                            nodes.append(SSSNode(move, index))
+                            heapq.heappush(heap, (priority, -next(sequence), len(nodes) - 1, State.LIVE, None))
+                    else:
+                        move = game.get_turbo_valid_moves(game.get_current_player())[0]
+                        nodes.append(SSSNode(move, index))
+                        heapq.heappush(heap, (priority, -next(sequence), len(nodes) - 1, State.LIVE, None))
+                elif len(path) % 2 == 1:
+                    # Solved child of a MAX node, the MAX node is solved
+                    solved.add(parent)
+                    heapq.heappush(heap, (priority, -next(sequence), parent, State.SOLVE, nodes[index].move))
                 else:
-                    try:
-                        pq.put(PriorityQueueItem(h, node.parent.children.pop(), State.LIVE, None))
-                    except IndexError:
-                        pq.put(PriorityQueueItem(h, node.parent, State.SOLVE, node.last_move))
+                    # Solved child of a MIN node, search the next sibling
+                    move = nodes[index].move
+                    self.move_to(game, nodes, path, parent)
+                    moves = game.get_turbo_valid_moves(game.get_current_player())
+                    position = moves.index(move) + 1
+                    if position < len(moves):
+                        nodes.append(SSSNode(moves[position], parent))
+                        heapq.heappush(heap, (priority, -next(sequence), len(nodes) - 1, State.LIVE, None))
+                    else:
+                        heapq.heappush(heap, (priority, -next(sequence), parent, State.SOLVE, move))
+        finally:
+            for _ in path:
+                game.pop_move()
 
         return 0, None
 
+    @staticmethod
+    def is_stale(nodes: list[SSSNode], index: int, solved: set[int]) -> bool:
+        """Check if an ancestor of the node was solved"""
+        index = nodes[index].parent
+        while index >= 0:
+            if index in solved:
+                return True
+            index = nodes[index].parent
+        return False
 
-        
+    @staticmethod
+    def move_to(game: Game, nodes: list[SSSNode], path: list[int], index: int) -> None:
+        """Push and pop moves so that the game is at the node, keeping the common prefix"""
+        target = get_path(nodes, index)
+        common = 0
+        while common < len(path) and common < len(target) and path[common] == target[common]:
+            common += 1
+        while len(path) > common:
+            game.pop_move()
+            path.pop()
+        for node in target[common:]:
+            game.push_move(nodes[node].move)
+            path.append(node)
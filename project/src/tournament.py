@@ -0,0 +1,207 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .utils.manager_func import match_manager
+from .utils.evaluation_cache import configure_evaluation_cache
+from .game.game import PlayerOrder, MOVE_TYPE
+from .utils.game_func import match_game
+from dataclasses import dataclass, replace
+from itertools import combinations
+from typing import Optional, TextIO
+from .config import Config
+import statistics
+import logging
+import random
+import time
+import json
+import csv
+
+CSV_FIELDS = [
+    "game_id", "pairing", "player1", "player2", "winner", "winner_name", "winner_seat", "length", "opening",
+    "player1_mean_latency_ms", "player1_max_latency_ms", "player1_nodes",
+    "player2_mean_latency_ms", "player2_max_latency_ms", "player2_nodes",
+]
+# Sides of a pairing, the colours of the seats are swapped every other game
+SEATS = ("player1", "player2")
+
+
+@dataclass(frozen=True)
+class Contestant:
+    algorithm: str
+    depth: int
+
+    @staticmethod
+    def parse(spec: str) -> Contestant:
+        """Parse an "algorithm" or "algorithm:depth" spec"""
+        algorithm, _, depth = spec.partition(":")
+        return Contestant(algorithm, int(depth) if depth else 2)
+
+    def __str__(self) -> str:
+        return f"{self.algorithm}:{self.depth}"
+
+
+@dataclass(frozen=True)
+class GameTask:
+    game_id: int
+    # Index of the pairing in the tournament
+    pairing: int
+    player1: Contestant
+    player2: Contestant
+    opening: tuple[MOVE_TYPE, ...]
+    seed: int
+    # True if the second seat of the pairing plays PLAYER1
+    swapped: bool = False
+
+
+def get_opening(config: Config, length: int, rng: random.Random) -> tuple[MOVE_TYPE, ...]:
+    """Return random moves played at the start of a game, stopping before a win"""
+    game = match_game(config, {})
+    game.create_board()
+    opening = []
+    for _ in range(length):
+        move = rng.choice(game.get_valid_moves(game.get_current_player()))
+        game.push_move(move)
+        if game.is_over():
+            break
+        opening.append(move)
+    return tuple(opening)
+
+
+def play_game(config: Config, task: GameTask) -> dict:
+    """Play one game of the tournament and return its result"""
+    random.seed(task.seed)
+    contestants = {PlayerOrder.PLAYER1: task.player1, PlayerOrder.PLAYER2: task.player2}
+    managers = {
+        player: match_manager(config, contestant.algorithm, contestant.depth)
+        for player, contestant in contestants.items()
+    }
+    latencies: dict[PlayerOrder, list[float]] = {player: [] for player in PlayerOrder}
+    nodes: dict[PlayerOrder, list[int]] = {player: [] for player in PlayerOrder}
+
+    game = match_game(config, {})
+    game.create_board()
+    for move in task.opening:
+        game.move(move)
+
+    winner = None
+    while not game.is_over():
+        player = game.get_current_player()
+        manager = managers[player]
+        nodes_before = manager.nodes
+        start = time.perf_counter()
+        move = manager.get_move(game)
+        latencies[player].append((time.perf_counter() - start) * 1000)
+        nodes[player].append(manager.nodes - nodes_before)
+        if move is None or move not in game.get_valid_moves(player):
+            logging.error(f"{contestants[player]} played the invalid move {move} in game {task.game_id}")
+            winner = PlayerOrder.PLAYER2 if player == PlayerOrder.PLAYER1 else PlayerOrder.PLAYER1
+            break
+        game.move(move)
+    if winner is None:
+        winner = game.get_winner()
+    winner_seat = None
+    if winner:
+        winner_seat = SEATS[(winner == PlayerOrder.PLAYER2) != task.swapped]
+
+    return {
+        "game_id": task.game_id,
+        "pairing": task.pairing,
+        "player1": str(task.player1),
+        "player2": str(task.player2),
+        "winner": winner.name if winner else None,
+        "winner_name": str(contestants[winner]) if winner else None,
+        "winner_seat": winner_seat,
+        "length": len(game.get_move_history()),
+        "opening": [list(move) for move in task.opening],
+        "latencies_ms": {player.name: latencies[player] for player in PlayerOrder},
+        "nodes": {player.name: nodes[player] for player in PlayerOrder},
+    }
+
+
+class Tournament:
+    """Play games between managers across a pool of processes.
+
+    Each pairing plays its games two by two, on the same random opening
+    with the colours swapped.
+    """
+
+    def __init__(self, config: Config, contestants: list[Contestant], round_robin: bool = False) -> None:
+        # Each game already runs in its own process, the managers get no pool of their own
+        self.config = replace(
+            config,
+            search=replace(config.search, workers=1),
+            mcts=replace(config.mcts, workers=1),
+        )
+        if any(contestant.algorithm == "human" for contestant in contestants):
+            raise ValueError("A tournament can not be played by a human")
+        if round_robin:
+            self.pairings = list(combinations(contestants, 2))
+        elif len(contestants) == 2:
+            self.pairings = [(contestants[0], contestants[1])]
+        else:
+            raise ValueError("Exactly two contestants are needed without round robin")
+
+    # REQUESTS
+    def get_tasks(self, games: int, opening_length: int, seed: int) -> list[GameTask]:
+        """Return the games to play, games per pairing"""
+        rng = random.Random(seed)
+        tasks = []
+        for pairing, (first, second) in enumerate(self.pairings):
+            opening = ()
+            for k in range(games):
+                swapped = k % 2 == 1
+                if not swapped:
+                    opening = get_opening(self.config, opening_length, rng)
+                player1, player2 = (second, first) if swapped else (first, second)
+                tasks.append(GameTask(
+                    len(tasks), pairing, player1, player2, opening, rng.getrandbits(32), swapped
+                ))
+        return tasks
+
+    def get_contestant(self, pairing: int, seat: str) -> Contestant:
+        """Return the contestant of a seat of a pairing"""
+        return self.pairings[pairing][SEATS.index(seat)]
+
+    # COMMANDS
+    def run(self, games: int, output: TextIO, output_format: str = "jsonl", workers: Optional[int] = None, opening_length: int = 0, seed: int = 0) -> dict[tuple[int, str], int]:
+        """Play the tournament, stream each result to output and return the wins per (pairing, seat).
+
+        The seats keep the two sides of a self-play pairing apart.
+        """
+        tasks = self.get_tasks(games, opening_length, seed)
+        logging.info(f"Playing {len(tasks)} games over {len(self.pairings)} pairings")
+        writer = None
+        if output_format == "csv":
+            writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+
+        wins = {(pairing, seat): 0 for pairing in range(len(self.pairings)) for seat in SEATS}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=configure_evaluation_cache,
+            initargs=(self.config.search.evaluation_cache_size,),
+        ) as executor:
+            futures = [executor.submit(play_game, self.config, task) for task in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                if result["winner_seat"]:
+                    wins[(result["pairing"], result["winner_seat"])] += 1
+                if writer:
+                    writer.writerow(self.to_row(result))
+                else:
+                    output.write(json.dumps(result) + "\n")
+                output.flush()
+        return wins
+
+    # UTILS
+    @staticmethod
+    def to_row(result: dict) -> dict:
+        """Flatten a result for the csv output"""
+        row = {field: result[field] for field in CSV_FIELDS if field in result}
+        row["opening"] = " ".join(f"{x},{y}" for x, y in result["opening"])
+        for player in PlayerOrder:
+            latencies = result["latencies_ms"][player.name]
+            prefix = player.name.lower()
+            row[f"{prefix}_mean_latency_ms"] = round(statistics.fmean(latencies), 3) if latencies else 0
+            row[f"{prefix}_max_latency_ms"] = round(max(latencies), 3) if latencies else 0
+            row[f"{prefix}_nodes"] = sum(result["nodes"][player.name])
+        return row
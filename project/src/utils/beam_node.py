@@ -1,22 +1,54 @@
 from __future__ import annotations
-from .node import Node
-from ..game.game import Game
+from .heuristics_func import two_distance_moves
+from ..game.game import Game, PlayerOrder, MOVE_TYPE
 from typing import Optional
-from .heuristics_func import Heuristic, evaluate
-
-class BeamNode(Node):
-    # TODO Implement beamsize in config
-    def __init__(self, game: Game, value: float, children: Optional[list[Node]] = None) -> None:
-        super().__init__(game, value, children)
-        self.beam_width = 6
-        if self.beam_width < 1:
-            raise ValueError("Beam width should be at least 1")
-    
-    def expand(self) -> list[Node]:
-        """Return all possible children of the node"""
-        for move in self.game.get_valid_moves(self.game.get_current_player()):
-            game_copy = self.game.copy()
-            game_copy.move(move)
-            self.children.append(BeamNode(game_copy, evaluate(game_copy, game_copy.get_current_player(), Heuristic.TWO_DISTANCE)))
-        self.children = sorted(self.children, key=lambda x: x.get_value(), reverse=True)[:self.beam_width]
-        return self.children
\ No newline at end of file
+
+
+class BeamNode:
+    """State kept by a beam search, reached by playing move from parent.
+
+    The game is not stored, it is rebuilt by pushing get_moves on the root
+    game. value is from the point of view of the searching player, the
+    static evaluation until backup gives it the value of the kept children.
+    complete is True once the value comes from the full depth of the search
+    or from a game over.
+    """
+
+    __slots__ = ("move", "value", "parent", "children", "complete")
+
+    def __init__(self, move: Optional[MOVE_TYPE], value: float, parent: Optional[BeamNode] = None) -> None:
+        self.move = move
+        self.value = value
+        self.parent = parent
+        # Children kept in the beam
+        self.children: list[BeamNode] = []
+        self.complete = False
+
+    # REQUESTS
+    def get_moves(self) -> list[MOVE_TYPE]:
+        """Return the moves from the root to the node"""
+        moves = []
+        node = self
+        while node.parent is not None:
+            moves.append(node.move)
+            node = node.parent
+        moves.reverse()
+        return moves
+
+    # COMMANDS
+    def expand(self, game: Game, player: PlayerOrder) -> list[BeamNode]:
+        """Return every child scored in one batched call, the game must be at the node"""
+        moves = game.get_turbo_valid_moves(game.get_current_player())
+        values = two_distance_moves(game, moves, player)
+        return [BeamNode(move, value, self) for move, value in zip(moves, values)]
+
+    def backup(self, maximizing: bool) -> None:
+        """Take the best value of the complete children, for the player to move.
+
+        A child pruned before the full depth keeps a shallower value, which
+        can not be compared with the others, so it is left out.
+        """
+        values = [child.value for child in self.children if child.complete]
+        if values:
+            self.value = max(values) if maximizing else min(values)
+            self.complete = True
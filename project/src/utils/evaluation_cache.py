@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+# Entries of the cache until a manager configures it
+DEFAULT_SIZE = 65536
+
+
+class EvaluationCache:
+    """Heuristic values of the positions, the least recently used are evicted first.
+
+    The keys are (zobrist key, heuristic, player). A size of 0 disables
+    the cache.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.entries: OrderedDict[Hashable, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # REQUESTS
+    def get(self, key: Hashable) -> Optional[float]:
+        """Return the value stored for the key, None if absent"""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def get_statistics(self) -> dict[str, float]:
+        """Return the hit, miss and eviction counters of the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    # COMMANDS
+    def put(self, key: Hashable, value: float) -> None:
+        """Store the value, evicting the least recently used entry if the cache is full"""
+        entries = self.entries
+        entries[key] = value
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, size: int) -> None:
+        """Change the number of entries, the least recently used are evicted"""
+        if size < 0:
+            raise ValueError("Evaluation cache size should be at least 0")
+        self.size = size
+        while len(self.entries) > size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all the entries"""
+        self.entries.clear()
+
+    def reset_statistics(self) -> None:
+        """Reset the counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+# Shared by all the managers of the process
+evaluation_cache = EvaluationCache(DEFAULT_SIZE)
+
+
+def configure_evaluation_cache(size: int) -> None:
+    """Set the size of the shared evaluation cache"""
+    if size != evaluation_cache.size:
+        evaluation_cache.resize(size)
@@ -0,0 +1,20 @@
+from ..game.bitboard_game import BitboardGame
+from ..game.game import Game
+from typing import Callable
+from ..config import Config
+import logging
+import sys
+
+
+def match_game(config: Config, player_controllers: dict[str, Callable]) -> Game:
+    """Return a game using the board backend from the config"""
+    match config.game.backend:
+        case "graph":
+            return Game(config, player_controllers)
+        case "bitboard":
+            return BitboardGame(config, player_controllers)
+        case _:
+            logging.error(
+                f'Found "{config.game.backend}" in class App in method match_game'
+            )
+            sys.exit(1)
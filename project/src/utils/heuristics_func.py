@@ -1,8 +1,21 @@
 from ..game.game import Game, PlayerOrder, MOVE_TYPE
+from .resistance import get_log_ratio, solve_conductances
+from .evaluation_cache import evaluation_cache
 from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
 from enum import Enum
 import networkx as nx
+import numpy as np
+import logging
 import random
+import time
+import sys
+
+# Value of a won game, the searches add or take the depth left to it
+WIN_VALUE = 10 ** 6
+# Bound of the heuristic values, any value beyond it is a proven result
+HEURISTIC_LIMIT = WIN_VALUE // 2
 
 
 class Heuristic(Enum):
@@ -11,23 +24,121 @@ class Heuristic(Enum):
     RANDOM = "random"
     # Return the difference between the two distances of each player
     TWO_DISTANCE = "two_distance"
-    # Use A* to find the shortest path between the two edges
+    # Return the difference between the numbers of shortest paths between the two edges of each player
     A_STAR = "a_star"
+    # Return the difference between the shortest path lengths, the numbers of shortest paths break the ties
+    SHORTEST_PATHS = "shortest_paths"
+    # Return the log ratio of the conductances between the two edges of each player
+    RESISTANCE = "resistance"
+
+
+@dataclass
+class HeuristicTiming:
+    """Calls and total time of a heuristic"""
+    calls: int = 0
+    seconds: float = 0.0
+
+    def get_mean_ms(self) -> float:
+        """Return the mean time of a call in ms"""
+        return self.seconds * 1000 / self.calls if self.calls else 0.0
+
+
+# Time spent in each heuristic by evaluate since the last reset_heuristic_timings
+heuristic_timings: dict[Heuristic, HeuristicTiming] = {}
+# The timings cost two clock reads per evaluation, they are off unless asked for
+timing_enabled = False
 
 
 def evaluate(game: Game, player: PlayerOrder, heuristic: Heuristic) -> float:
-    """Return a value for the given game state using the given heuristic"""
+    """Return a value for the given game state using the given heuristic.
+
+    The values are kept in the evaluation cache of the process, the timings,
+    when enabled, only count the evaluations which were computed. The
+    heuristic values are clamped to HEURISTIC_LIMIT, the numbers of paths
+    of a_star can otherwise reach the values of the won games.
+    """
     if game.is_over():
         if game.get_winner() == player:
-            return 1000
-        return -1000
+            return WIN_VALUE
+        return -WIN_VALUE
 
+    # Random values are not worth keeping
+    cached = evaluation_cache.size > 0 and heuristic != Heuristic.RANDOM
+    if cached:
+        key = (game.get_zobrist_key(), heuristic, player)
+        value = evaluation_cache.get(key)
+        if value is not None:
+            return value
+
+    if timing_enabled:
+        value = get_timed_heuristic_value(game, player, heuristic)
+    else:
+        value = get_heuristic_value(game, player, heuristic)
+    value = max(-HEURISTIC_LIMIT, min(HEURISTIC_LIMIT, value))
+    if cached:
+        evaluation_cache.put(key, value)
+    return value
+
+
+def get_heuristic_value(game: Game, player: PlayerOrder, heuristic: Heuristic) -> float:
+    """Return the value of the heuristic for a game which is not over"""
     if heuristic == Heuristic.RANDOM:
         return random_heuristic()
     if heuristic == Heuristic.TWO_DISTANCE:
+        tracker = game.get_tracker(Heuristic.TWO_DISTANCE.value)
+        if tracker:
+            return tracker.evaluate(player)
         return two_distance(game, player)
     if heuristic == Heuristic.A_STAR:
         return a_star(game, player)
+    if heuristic == Heuristic.SHORTEST_PATHS:
+        return shortest_paths(game, player)
+    if heuristic == Heuristic.RESISTANCE:
+        return resistance(game, player)
+
+
+def get_timed_heuristic_value(game: Game, player: PlayerOrder, heuristic: Heuristic) -> float:
+    """Return the value of the heuristic and add its time to the timings"""
+    start = time.perf_counter()
+    value = get_heuristic_value(game, player, heuristic)
+    timing = heuristic_timings.get(heuristic)
+    if timing is None:
+        timing = heuristic_timings[heuristic] = HeuristicTiming()
+    timing.calls += 1
+    timing.seconds += time.perf_counter() - start
+    return value
+
+
+def is_proven(value: float) -> bool:
+    """Check if a search value comes from a game over or a virtual connection rather than a heuristic"""
+    return abs(value) > HEURISTIC_LIMIT
+
+
+def match_heuristic(name: str) -> Heuristic:
+    """Return a heuristic from its name in the config"""
+    for heuristic in Heuristic:
+        if heuristic.value == name:
+            return heuristic
+    logging.error(
+        f'Found "{name}" in method match_heuristic'
+    )
+    sys.exit(1)
+
+
+def set_heuristic_timing(enabled: bool) -> None:
+    """Record the time spent in each heuristic by evaluate, or stop recording it"""
+    global timing_enabled
+    timing_enabled = enabled
+
+
+def get_heuristic_timings() -> dict[Heuristic, HeuristicTiming]:
+    """Return the time spent in each heuristic by evaluate"""
+    return heuristic_timings
+
+
+def reset_heuristic_timings() -> None:
+    """Forget the time spent in the heuristics"""
+    heuristic_timings.clear()
 
 
 def random_heuristic() -> float:
@@ -37,21 +148,97 @@ def random_heuristic() -> float:
 
 def two_distance(game: Game, player: PlayerOrder) -> float:
     """Return the difference between the two distances of each player"""
-    player_1 = player
-    player_2 = PlayerOrder.PLAYER1 if player == PlayerOrder.PLAYER2 else PlayerOrder.PLAYER2
-    width, height = game.get_size()
+    return two_distance_batch([game], player)[0]
+
+
+def two_distance_batch(games: list[Game], player: PlayerOrder) -> list[float]:
+    """Return two_distance for many positions of the same size at once"""
+    players = (player, get_other_player(player))
+    adjacency = [game.get_adjacency_matrix(p) for game in games for p in players]
+    nodes = [game.get_empty_vector() for game in games]
+    return get_two_distance_differences(adjacency, nodes, games[0].get_size())
+
+
+def two_distance_moves(game: Game, moves: list[MOVE_TYPE], player: PlayerOrder) -> list[float]:
+    """Return evaluate with TWO_DISTANCE after each of the moves, in one batch.
+
+    The moves are pushed and popped on the game, which is left unchanged.
+    """
+    players = (player, get_other_player(player))
+    adjacency, nodes, finished = [], [], {}
+    for index, move in enumerate(moves):
+        game.push_move(move)
+        if game.is_over():
+            finished[index] = WIN_VALUE if game.get_winner() == player else -WIN_VALUE
+        adjacency.extend(game.get_adjacency_matrix(p) for p in players)
+        nodes.append(game.get_empty_vector())
+        game.pop_move()
+    values = get_two_distance_differences(adjacency, nodes, game.get_size())
+    for index, value in finished.items():
+        values[index] = value
+    return values
+
+
+def get_other_player(player: PlayerOrder) -> PlayerOrder:
+    """Return the opponent of the player"""
+    return PlayerOrder.PLAYER1 if player == PlayerOrder.PLAYER2 else PlayerOrder.PLAYER2
+
+
+def get_two_distance_differences(adjacency: list[np.ndarray], nodes: list[np.ndarray], size: tuple[int, int]) -> list[float]:
+    """Return the two-distance differences of positions given by their adjacency matrices.
+
+    adjacency holds the matrices of the player then of the opponent for
+    each position, nodes the empty vector of each position.
+    """
+    width, height = size
     high_value = width * height
-    node_values = {player_1: {}, player_2: {}}
-    for player in [player_1, player_2]:
-        graph = game.get_graph(player)
-        start, end, _, _ = game.get_start_end_order_edge(player)
-        distance_start = get_two_distance(game, graph, start, high_value)
-        distance_end = get_two_distance(game, graph, end, high_value)
-        node_values[player] = {
-            node: distance_start[node] + distance_end[node]
-            for node in game.get_valid_moves(player_1)
-        }
-    return min(node_values[player_2].values()) - min(node_values[player_1].values())
+    start, end = width * height, width * height + 1
+    positions = len(nodes)
+
+    # One map per (position, player, target), the start and end maps of a player share its adjacency
+    adjacency = np.stack(adjacency).repeat(2, axis=0)
+    nodes = np.stack(nodes).repeat(4, axis=0)
+    targets = np.tile((start, end), 2 * positions)
+    values = get_two_distance_maps(adjacency, nodes, targets, high_value)
+
+    totals = (values[0::2] + values[1::2]).reshape(positions, 2, -1)
+    totals = np.where(nodes[0::4, None, :], totals, np.iinfo(totals.dtype).max)
+    minimums = totals.min(axis=2)
+    return (minimums[:, 1] - minimums[:, 0]).tolist()
+
+
+def get_two_distance_maps(adjacency: np.ndarray, nodes: np.ndarray, targets: np.ndarray, high_value: int) -> np.ndarray:
+    """Vectorized get_two_distance over k graphs.
+
+    adjacency is a (k, n, n) boolean array, nodes a (k, n) mask of the
+    nodes to label and targets the k target rows. A node gets layer l + 1
+    as soon as two of its neighbors are labelled with layers <= l, which is
+    the fixed point reached by get_two_distance.
+    """
+    k, n, _ = adjacency.shape
+    rows = np.arange(k)
+    values = np.full((k, n), high_value, dtype=np.int64)
+    values[rows, targets] = 0
+
+    assigned = np.zeros((k, n), dtype=bool)
+    assigned[rows, targets] = True
+    first = adjacency[rows, targets] & nodes
+    values[first] = 1
+    assigned |= first
+    pending = nodes & ~assigned
+
+    counts_matrix = adjacency.astype(np.int16)
+    layer = 1
+    while pending.any():
+        counts = np.matmul(counts_matrix, assigned[..., None].astype(np.int16))[..., 0]
+        new = pending & (counts >= 2)
+        if not new.any():
+            break
+        layer += 1
+        values[new] = layer
+        assigned |= new
+        pending &= ~new
+    return values
 
 
 def get_two_distance(game: Game, graph: nx.Graph, target: tuple[int, int], high_value: int) -> dict:
@@ -96,15 +283,67 @@ def get_two_distance(game: Game, graph: nx.Graph, target: tuple[int, int], high_
 
 
 def a_star(game: Game, player: PlayerOrder) -> float:
-    """Return the shortest path between the start and end using the A* algorithm"""
-    p1_graph = game.get_graph(PlayerOrder.PLAYER1)
-    p2_graph = game.get_graph(PlayerOrder.PLAYER2)
-    p1_start, p1_end, _, _ = game.get_start_end_order_edge(PlayerOrder.PLAYER1)
-    p2_start, p2_end, _, _ = game.get_start_end_order_edge(PlayerOrder.PLAYER2)
-
-    p1_paths = list(nx.all_shortest_paths(p1_graph, p1_start, p1_end, weight="weight"))
-    p2_paths = list(nx.all_shortest_paths(p2_graph, p2_start, p2_end, weight="weight"))
-
-    if player == PlayerOrder.PLAYER1:
-        return len(p1_paths) - len(p2_paths)
-    return len(p2_paths) - len(p1_paths)
+    """Return the difference between the numbers of shortest paths between the edges of each player"""
+    size = game.get_size()[0] * game.get_size()[1]
+    _, own_count = count_shortest_paths(game.get_adjacency_matrix(player), size, size + 1)
+    _, other_count = count_shortest_paths(game.get_adjacency_matrix(get_other_player(player)), size, size + 1)
+    return own_count - other_count
+
+
+def shortest_paths(game: Game, player: PlayerOrder) -> float:
+    """Return the difference between the shortest path lengths of each player.
+
+    The share of the shortest paths of the player, between -0.5 and 0.5,
+    breaks the ties. A player with no path has a length of high value.
+    """
+    width, height = game.get_size()
+    size = width * height
+    own_length, own_count = count_shortest_paths(game.get_adjacency_matrix(player), size, size + 1)
+    other_length, other_count = count_shortest_paths(game.get_adjacency_matrix(get_other_player(player)), size, size + 1)
+    own_length = size if own_length is None else own_length
+    other_length = size if other_length is None else other_length
+    value = other_length - own_length
+    if own_count + other_count:
+        value += own_count / (own_count + other_count) - 0.5
+    return value
+
+
+def count_shortest_paths(adjacency: np.ndarray, start: int, end: int) -> tuple[Optional[int], float]:
+    """Return the length and the number of the shortest paths from start to end, None and 0 without path.
+
+    The nodes are visited by layers of a BFS, the number of shortest paths
+    to a node is the sum of the numbers of its neighbors in the previous
+    layer. The numbers are floats, they can be larger than 64-bit integers.
+    """
+    counts = np.zeros(len(adjacency))
+    counts[start] = 1
+    visited = np.zeros(len(adjacency), dtype=bool)
+    visited[start] = True
+    frontier = visited.copy()
+    length = 0
+    while not frontier[end]:
+        layer_counts = adjacency[:, frontier] @ counts[frontier]
+        frontier = (layer_counts > 0) & ~visited
+        if not frontier.any():
+            return None, 0.0
+        counts[frontier] = layer_counts[frontier]
+        visited |= frontier
+        length += 1
+    return length, float(counts[end])
+
+
+def resistance(game: Game, player: PlayerOrder) -> float:
+    """Return the log of the ratio between the conductances of the player and of the opponent.
+
+    The graph of each player is a network of unit resistors between its
+    two edges, a player with more and shorter paths conducts more.
+    """
+    tracker = game.get_tracker(Heuristic.RESISTANCE.value)
+    if tracker:
+        return tracker.evaluate(player)
+    width, height = game.get_size()
+    size = width * height
+    conductances, _ = solve_conductances(
+        [game.get_adjacency_matrix(player), game.get_adjacency_matrix(get_other_player(player))], size, size + 1
+    )
+    return get_log_ratio(*conductances)
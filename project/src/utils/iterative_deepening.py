@@ -0,0 +1,65 @@
+from .heuristics_func import is_proven
+from ..game.game import Game, MOVE_TYPE
+from typing import Callable, Optional
+import logging
+import time
+
+SEARCH_RESULT = tuple[float, Optional[MOVE_TYPE]]
+
+
+class SearchTimeout(Exception):
+    """Raised from inside a search when its time budget is spent"""
+
+
+class Deadline:
+    """Wall-clock budget of a search, only enforced once armed"""
+
+    def __init__(self, budget_ms: int) -> None:
+        self.start = time.perf_counter()
+        self.end = self.start + budget_ms / 1000
+        self.armed = False
+
+    # REQUESTS
+    def is_expired(self) -> bool:
+        """Check if the budget is spent"""
+        return time.perf_counter() >= self.end
+
+    def get_elapsed_ms(self) -> float:
+        """Return the time spent since the start of the search"""
+        return (time.perf_counter() - self.start) * 1000
+
+    # COMMANDS
+    def check(self) -> None:
+        """Raise SearchTimeout if the deadline is armed and the budget is spent"""
+        if self.armed and time.perf_counter() >= self.end:
+            raise SearchTimeout()
+
+
+def iterative_deepening(game: Game, search: Callable[[int, Optional[MOVE_TYPE]], SEARCH_RESULT], deadline: Deadline) -> tuple[float, Optional[MOVE_TYPE], int]:
+    """Call search(depth, first_move) with increasing depths until the deadline.
+
+    first_move is the best move of the previous iteration, to be searched
+    first. The first iteration always completes, then the result of the
+    deepest completed iteration is returned with its depth.
+    """
+    ply = len(game.get_move_history())
+    max_depth = len(game.get_valid_moves(game.get_current_player()))
+    value, best_move, completed_depth = float('-inf'), None, 0
+
+    for depth in range(1, max_depth + 1):
+        try:
+            value, best_move = search(depth, best_move)
+        except SearchTimeout:
+            # Take back the moves of the interrupted search
+            while len(game.get_move_history()) > ply:
+                game.pop_move()
+            break
+        completed_depth = depth
+        deadline.armed = True
+        if is_proven(value) or deadline.is_expired():
+            break
+
+    logging.debug(
+        f"Iterative deepening reached depth {completed_depth} in {deadline.get_elapsed_ms():.0f} ms"
+    )
+    return value, best_move, completed_depth
@@ -1,9 +1,12 @@
 from ..manager.alpha_beta_manager import AlphaBetaManager
 from ..manager.nega_beta_manager import NegaBetaManager
 from ..manager.minimax_manager import MinimaxManager
+from ..manager.mcts_manager import MCTSManager
+from ..manager.parallel_playout_manager import ParallelPlayoutManager
 from ..manager.random_manager import RandomManager
 from ..manager.user_manager import UserManager
 from ..manager.sss_manager import SSSManager
+from ..manager.beam_manager import BeamManager
 from ..manager.manager import Manager
 from ..config import Config
 import logging
@@ -25,6 +28,12 @@ def match_manager(config: Config, manager_name: str, depth: int) -> Manager:
             return NegaBetaManager(config, depth)
         case "sss":
             return SSSManager(config, depth)
+        case "beam":
+            return BeamManager(config, depth)
+        case "mcts":
+            return MCTSManager(config)
+        case "parallel_playout":
+            return ParallelPlayoutManager(config)
         case _:
             logging.error(
                 f'Found "{manager_name}" in class App in method match_manager'
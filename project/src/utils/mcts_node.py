@@ -0,0 +1,61 @@
+from __future__ import annotations
+from typing import Optional
+import math
+
+
+class MCTSNode:
+    """Node of a Monte Carlo search tree, reached by player playing move.
+
+    Moves are flat cell indexes. wins and amaf_wins count the playouts won
+    by player, amaf_* are the all-moves-as-first statistics of the move.
+    """
+
+    __slots__ = (
+        "move", "player", "parent", "children", "untried",
+        "visits", "wins", "amaf_visits", "amaf_wins"
+    )
+
+    def __init__(self, move: Optional[int], player: int, parent: Optional[MCTSNode] = None) -> None:
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: list[MCTSNode] = []
+        # Moves not expanded yet, None until the node is first selected
+        self.untried: Optional[list[int]] = None
+        self.visits = 0
+        self.wins = 0
+        self.amaf_visits = 0
+        self.amaf_wins = 0
+
+    # REQUESTS
+    def get_child(self, move: int) -> Optional[MCTSNode]:
+        """Return the child reached by move, if expanded"""
+        for child in self.children:
+            if child.move == move:
+                return child
+        return None
+
+    def get_most_visited_child(self) -> Optional[MCTSNode]:
+        """Return the child with the most playouts"""
+        return max(self.children, key=lambda child: child.visits, default=None)
+
+    def select_child(self, exploration: float, rave_equivalence: float) -> MCTSNode:
+        """Return the child maximizing the UCT value, blended with RAVE if rave_equivalence > 0"""
+        log_visits = math.log(self.visits)
+        best_child, best_score = self.children[0], -math.inf
+        for child in self.children:
+            value = child.wins / child.visits
+            if rave_equivalence and child.amaf_visits:
+                beta = math.sqrt(rave_equivalence / (3 * child.visits + rave_equivalence))
+                value = (1 - beta) * value + beta * child.amaf_wins / child.amaf_visits
+            score = value + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_child, best_score = child, score
+        return best_child
+
+    def get_tree_size(self) -> int:
+        """Return the size of the tree"""
+        size = 1
+        for child in self.children:
+            size += child.get_tree_size()
+        return size
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from ..game.game import PlayerOrder, MOVE_TYPE
+from abc import ABC, abstractmethod
+from typing import Optional
+from enum import Enum
+import logging
+import sys
+
+
+class Ordering(Enum):
+    """Enum for the move ordering strategies"""
+    TT_MOVE = "tt_move"
+    KILLER = "killer"
+    HISTORY = "history"
+
+
+class OrderingStrategy(ABC):
+    """Score moves so that the moves most likely to cause a cutoff are searched first"""
+
+    @abstractmethod
+    def score(self, move: MOVE_TYPE, ply: int, player: PlayerOrder, tt_move: Optional[MOVE_TYPE]) -> int:
+        """Return the score of the move at the ply, higher is searched first"""
+        return NotImplemented
+
+    def add_cutoff(self, move: MOVE_TYPE, depth: int, ply: int, player: PlayerOrder) -> None:
+        """Record that the move caused a beta cutoff with depth left to search"""
+        pass
+
+    def new_search(self) -> None:
+        """Age what was learned before a search from a new root"""
+        pass
+
+    def clear(self) -> None:
+        """Forget what was learned"""
+        pass
+
+
+class TTMoveFirst(OrderingStrategy):
+    """The best move stored in the transposition table first"""
+
+    def score(self, move: MOVE_TYPE, ply: int, player: PlayerOrder, tt_move: Optional[MOVE_TYPE]) -> int:
+        """Return 1 for the transposition table move"""
+        return int(move == tt_move)
+
+
+class KillerMoves(OrderingStrategy):
+    """Moves which caused a cutoff at the same distance from the root in a sibling node"""
+
+    def __init__(self, slots: int = 2) -> None:
+        self.slots = slots
+        self.killers: dict[int, list[MOVE_TYPE]] = {}
+
+    def score(self, move: MOVE_TYPE, ply: int, player: PlayerOrder, tt_move: Optional[MOVE_TYPE]) -> int:
+        """Return a higher score for the most recent killers of the ply"""
+        killers = self.killers.get(ply)
+        if killers and move in killers:
+            return self.slots - killers.index(move)
+        return 0
+
+    def add_cutoff(self, move: MOVE_TYPE, depth: int, ply: int, player: PlayerOrder) -> None:
+        """Make the move the first killer of the ply"""
+        killers = self.killers.setdefault(ply, [])
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[self.slots:]
+
+    def new_search(self) -> None:
+        """Forget the killers, they were found below another root"""
+        self.killers = {}
+
+    def clear(self) -> None:
+        """Forget the killers"""
+        self.killers = {}
+
+
+class HistoryHeuristic(OrderingStrategy):
+    """Moves which caused many deep cutoffs for the player anywhere in the tree"""
+
+    def __init__(self) -> None:
+        self.history: dict[tuple[PlayerOrder, MOVE_TYPE], int] = {}
+
+    def score(self, move: MOVE_TYPE, ply: int, player: PlayerOrder, tt_move: Optional[MOVE_TYPE]) -> int:
+        """Return the history score of the move for the player"""
+        return self.history.get((player, move), 0)
+
+    def add_cutoff(self, move: MOVE_TYPE, depth: int, ply: int, player: PlayerOrder) -> None:
+        """Add depth squared to the score of the move, deep cutoffs save more"""
+        key = (player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+    def new_search(self) -> None:
+        """Halve the scores, the cutoffs of the previous positions count less and less"""
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+
+    def clear(self) -> None:
+        """Forget the scores"""
+        self.history = {}
+
+
+def match_ordering(name: str) -> OrderingStrategy:
+    """Return a move ordering strategy from its name in the config"""
+    match name:
+        case Ordering.TT_MOVE.value:
+            return TTMoveFirst()
+        case Ordering.KILLER.value:
+            return KillerMoves()
+        case Ordering.HISTORY.value:
+            return HistoryHeuristic()
+        case _:
+            logging.error(
+                f'Found "{name}" in method match_ordering'
+            )
+            sys.exit(1)
+
+
+class MoveOrdering:
+    """Order moves by the scores of the strategies, in priority order.
+
+    The moves are given in center order, which breaks the ties. The ply is
+    the distance from the root of the search, the killers are kept between
+    the iterations of a search and dropped by new_search.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        self.strategies = [match_ordering(name) for name in names]
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    # REQUESTS
+    def order(self, moves: list[MOVE_TYPE], ply: int, player: PlayerOrder, tt_move: Optional[MOVE_TYPE] = None) -> list[MOVE_TYPE]:
+        """Return the moves sorted by the strategies"""
+        if not self.strategies:
+            return moves
+        strategies = self.strategies
+        return sorted(
+            moves,
+            key=lambda move: tuple(strategy.score(move, ply, player, tt_move) for strategy in strategies),
+            reverse=True,
+        )
+
+    def get_statistics(self) -> dict[str, float]:
+        """Return the beta cutoff counters, a high first move rate means a good ordering"""
+        return {
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
+
+    # COMMANDS
+    def add_cutoff(self, move: MOVE_TYPE, index: int, depth: int, ply: int, player: PlayerOrder) -> None:
+        """Record a beta cutoff by the move searched at index of its node"""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        for strategy in self.strategies:
+            strategy.add_cutoff(move, depth, ply, player)
+
+    def new_search(self) -> None:
+        """Age what every strategy learned, at the start of each search"""
+        for strategy in self.strategies:
+            strategy.new_search()
+
+    def clear(self) -> None:
+        """Forget what every strategy learned and reset the counters"""
+        for strategy in self.strategies:
+            strategy.clear()
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
@@ -1,21 +1,66 @@
+from dataclasses import dataclass
+import numpy as np
+from functools import lru_cache
 from ..config import Config
 
 
-def hex_neighbors(hexagon: tuple[int, int], config: Config) -> list[tuple[int, int]]:
+@dataclass(frozen=True)
+class NeighborTable:
+    """Neighbors of every cell of a board of a given size.
+
+    Cell (x, y) is index x * height + y, the neighbors of a cell are in
+    the same order in all the fields.
+    """
+    cells: tuple[tuple[int, int], ...]
+    indexes: dict[tuple[int, int], int]
+    neighbors: tuple[tuple[tuple[int, int], ...], ...]
+    neighbor_indexes: tuple[tuple[int, ...], ...]
+    # Bit i is set for each neighbor of index i
+    neighbor_masks: tuple[int, ...]
+    # Cell indexes sorted by distance to the center of the board
+    center_order: tuple[int, ...]
+
+
+@lru_cache(maxsize=None)
+def get_neighbor_table(width: int, height: int) -> NeighborTable:
+    """Build the neighbor table of a board of size width x height, once per size"""
+    cells = tuple((x, y) for x in range(width) for y in range(height))
+    neighbors = []
+    for x, y in cells:
+        res = []
+        if not (x == 0):
+            res.append((x - 1, y))
+        if not (x == width - 1):
+            res.append((x + 1, y))
+        if not (y == 0):
+            res.append((x, y - 1))
+        if not (y == height - 1):
+            res.append((x, y + 1))
+        if not (x == 0) and not (y == height - 1):
+            res.append((x - 1, y + 1))
+        if not (x == width - 1) and not (y == 0):
+            res.append((x + 1, y - 1))
+        neighbors.append(tuple(res))
+
+    neighbor_indexes = tuple(
+        tuple(nx * height + ny for nx, ny in cell_neighbors) for cell_neighbors in neighbors
+    )
+    center = np.array((width//2, height//2))
+    center_order = sorted(
+        range(len(cells)), key=lambda index: np.linalg.norm(np.array(cells[index]) - center)
+    )
+    return NeighborTable(
+        cells=cells,
+        indexes={cell: index for index, cell in enumerate(cells)},
+        neighbors=tuple(neighbors),
+        neighbor_indexes=neighbor_indexes,
+        neighbor_masks=tuple(sum(1 << index for index in indexes) for indexes in neighbor_indexes),
+        center_order=tuple(center_order),
+    )
+
+
+def hex_neighbors(hexagon: tuple[int, int], config: Config) -> tuple[tuple[int, int], ...]:
     """Returns the neighbors of a hexagon"""
-    size = (config.game.board_width, config.game.board_height)
     x, y = hexagon
-    res = []
-    if not (x == 0):
-        res.append((x - 1, y))
-    if not (x == size[0] - 1):
-        res.append((x + 1, y))
-    if not (y == 0):
-        res.append((x, y - 1))
-    if not (y == size[1] - 1):
-        res.append((x, y + 1))
-    if not (x == 0) and not (y == size[1] - 1):
-        res.append((x - 1, y + 1))
-    if not (x == size[0] - 1) and not (y == 0):
-        res.append((x + 1, y - 1))
-    return res
+    height = config.game.board_height
+    return get_neighbor_table(config.game.board_width, height).neighbors[x * height + y]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, wait
+from ..game.game import Game, PlayerOrder, MOVE_TYPE
+from .evaluation_cache import configure_evaluation_cache
+from multiprocessing.sharedctypes import Synchronized
+from dataclasses import replace
+from typing import Callable, Optional
+from ..config import Config
+import multiprocessing
+import math
+
+# Seconds between two checks of the cancel flag while waiting for the workers
+CANCEL_CHECK_INTERVAL = 0.05
+
+# State of each worker process, set by init_worker
+worker_manager = None
+shared_alpha: Optional[Synchronized] = None
+
+
+def init_worker(manager_class: type, config: Config, depth: int, alpha: Synchronized) -> None:
+    """Build the sequential manager used by a worker process"""
+    global worker_manager, shared_alpha
+    worker_config = replace(config, search=replace(config.search, workers=1))
+    configure_evaluation_cache(config.search.evaluation_cache_size)
+    worker_manager = manager_class(worker_config, depth)
+    shared_alpha = alpha
+
+
+def search_root_move(game: Game, move: MOVE_TYPE, depth: int, player: PlayerOrder) -> tuple[float, int]:
+    """Search one root move with the best value found so far by any worker as alpha.
+
+    Return the value of the move and the number of nodes searched.
+    """
+    # Just below the shared alpha so that ties are still searched exactly
+    alpha = math.nextafter(shared_alpha.value, -math.inf)
+    nodes = worker_manager.nodes
+    value = worker_manager.search_root_move(game, move, depth, alpha, player)
+    with shared_alpha.get_lock():
+        if value > shared_alpha.value:
+            shared_alpha.value = value
+    return value, worker_manager.nodes - nodes
+
+
+class ParallelRootSearch:
+    """Split the root moves of a search across a pool of processes.
+
+    The workers share the alpha bound of the root. A move whose value is
+    at least the bound is always searched exactly, so the first move with
+    the best value is the one the sequential search would return.
+    """
+
+    def __init__(self, manager_class: type, config: Config, depth: int, workers: int) -> None:
+        self.manager_class = manager_class
+        self.config = config
+        self.depth = depth
+        self.workers = workers
+        self.shared_alpha: Optional[Synchronized] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def search(self, game: Game, moves: list[MOVE_TYPE], check_cancelled: Optional[Callable[[], None]] = None) -> tuple[float, Optional[MOVE_TYPE], int]:
+        """Return the best value and move of the root and the number of nodes searched.
+
+        The moves are given in search order. check_cancelled is called while
+        waiting for the workers, if it raises the pool is dropped without
+        waiting for the moves being searched.
+        """
+        if self.executor is None:
+            # A new bound, the workers of a dropped pool may still write to the old one
+            self.shared_alpha = multiprocessing.Value("d", float("-inf"))
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.manager_class, self.config, self.depth, self.shared_alpha),
+            )
+        self.shared_alpha.value = float("-inf")
+
+        # The controllers hold the managers, which are not sent to the workers
+        root = game.copy()
+        root.player_controllers = {}
+        player = game.get_current_player()
+        futures = [
+            self.executor.submit(search_root_move, root, move, self.depth, player)
+            for move in moves
+        ]
+
+        pending = set(futures)
+        try:
+            while pending:
+                if check_cancelled:
+                    check_cancelled()
+                _, pending = wait(pending, timeout=CANCEL_CHECK_INTERVAL)
+        except BaseException:
+            self.shutdown(wait=False)
+            raise
+
+        best_value, best_move, total_nodes = float("-inf"), None, 1
+        for move, future in zip(moves, futures):
+            value, nodes = future.result()
+            total_nodes += nodes
+            if value > best_value:
+                best_value, best_move = value, move
+        return best_value, best_move, total_nodes
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes, without waiting for their current tasks if wait is False"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from ..game.game import Game, PlayerOrder
+from .neighbors import get_neighbor_table
+from dataclasses import dataclass
+from functools import lru_cache
+from random import shuffle
+
+# Values of the cells of a flat board, cell (x, y) is x * height + y
+EMPTY = 0
+PLAYER1 = PlayerOrder.PLAYER1.value
+PLAYER2 = PlayerOrder.PLAYER2.value
+
+
+@dataclass(frozen=True)
+class PlayoutTables:
+    """Lookups of the playouts for a board of a given size"""
+    size: int
+    # Neighbors of each cell with a greater index, the cells on the first and
+    # last columns also link to the virtual nodes size and size + 1 of PLAYER1
+    forward_neighbors: tuple[tuple[int, ...], ...]
+
+
+@lru_cache(maxsize=None)
+def get_playout_tables(width: int, height: int) -> PlayoutTables:
+    """Build the lookups for a board of size width x height, once per size"""
+    size = width * height
+    table = get_neighbor_table(width, height)
+    forward_neighbors = []
+    for index, (x, _) in enumerate(table.cells):
+        neighbors = [neighbor for neighbor in table.neighbor_indexes[index] if neighbor > index]
+        if x == 0:
+            neighbors.append(size)
+        if x == width - 1:
+            neighbors.append(size + 1)
+        forward_neighbors.append(tuple(neighbors))
+    return PlayoutTables(size, tuple(forward_neighbors))
+
+
+def get_cells(game: Game) -> list[int]:
+    """Return the flat board of the game"""
+    return game.stones.copy()
+
+
+def get_full_board_winner(cells: list[int], tables: PlayoutTables) -> int:
+    """Return the winner of a full board with one union-find pass over the cells of PLAYER1"""
+    size = tables.size
+    forward_neighbors = tables.forward_neighbors
+    parent = list(range(size + 2))
+    for cell in range(size):
+        if cells[cell] != PLAYER1:
+            continue
+        for neighbor in forward_neighbors[cell]:
+            if neighbor < size and cells[neighbor] != PLAYER1:
+                continue
+            # Union with path halving
+            root = cell
+            while parent[root] != root:
+                parent[root] = parent[parent[root]]
+                root = parent[root]
+            other = neighbor
+            while parent[other] != other:
+                parent[other] = parent[parent[other]]
+                other = parent[other]
+            if root != other:
+                parent[root] = other
+
+    start, end = size, size + 1
+    while parent[start] != start:
+        start = parent[start]
+    while parent[end] != end:
+        end = parent[end]
+    # A full board always has exactly one winner
+    return PLAYER1 if start == end else PLAYER2
+
+
+def random_playout(cells: list[int], player: int, tables: PlayoutTables) -> int:
+    """Fill the empty cells at random, player first, and return the winner.
+
+    The cells are filled in place.
+    """
+    empty = [cell for cell in range(tables.size) if cells[cell] == EMPTY]
+    shuffle(empty)
+    opponent = PLAYER2 if player == PLAYER1 else PLAYER1
+    for cell in empty[0::2]:
+        cells[cell] = player
+    for cell in empty[1::2]:
+        cells[cell] = opponent
+    return get_full_board_winner(cells, tables)
@@ -0,0 +1,57 @@
+from scipy.sparse.linalg import cg
+from typing import Optional
+import scipy.sparse as sp
+import numpy as np
+
+# Added to the conductances so that a player without path has a finite log ratio
+CONDUCTANCE_EPSILON = 1e-6
+# Leak to the ground of every node, so that the nodes cut from the edges do not make the system singular
+GROUND_LEAK = 1e-9
+# Relative residual at which the conjugate gradient stops
+CG_TOLERANCE = 1e-6
+
+
+def solve_conductances(adjacencies: list[np.ndarray], start: int, end: int, initial: Optional[list[np.ndarray]] = None) -> tuple[list[float], list[np.ndarray]]:
+    """Return the conductance between start and end and the potentials of each network.
+
+    Each edge of a graph is a unit resistor, start is held at potential 1
+    and end at 0. The Laplacian systems of the other nodes are solved
+    together as one block diagonal system with a Jacobi preconditioned
+    conjugate gradient, from the initial potentials if given. The
+    potentials are indexed like the adjacency matrices without start and
+    end, a played cell has no edge and a potential of 0.
+    """
+    adjacency = np.stack(adjacencies)
+    count, size = adjacency.shape[0], adjacency.shape[1]
+    inner = np.array([node for node in range(size) if node not in (start, end)])
+    inner_size = len(inner)
+    degrees = adjacency.sum(axis=2)[:, inner]
+
+    blocks, rows, columns = np.nonzero(adjacency[:, inner][:, :, inner])
+    diagonal = np.where(degrees > 0, degrees + GROUND_LEAK, 1.0).ravel()
+    nodes = np.arange(count * inner_size)
+    matrix = sp.csr_matrix(
+        (
+            np.concatenate((-np.ones(len(blocks)), diagonal)),
+            (
+                np.concatenate((blocks * inner_size + rows, nodes)),
+                np.concatenate((blocks * inner_size + columns, nodes)),
+            ),
+        ),
+        shape=(count * inner_size, count * inner_size),
+    )
+    rhs = adjacency[:, inner, start].astype(float).ravel()
+    x0 = np.concatenate(initial) if initial is not None else None
+    solution, _ = cg(matrix, rhs, x0=x0, rtol=CG_TOLERANCE, M=sp.diags(1 / diagonal))
+
+    potentials = solution.reshape(count, inner_size)
+    start_rows = adjacency[:, start, inner]
+    conductances = start_rows.sum(axis=1) + adjacency[:, start, end] - (start_rows * potentials).sum(axis=1)
+    return conductances.tolist(), list(potentials)
+
+
+def get_log_ratio(own: float, other: float) -> float:
+    """Return the log of the ratio between the conductances of the player and of the opponent"""
+    # The solve is approximate, a network without path can come out slightly negative
+    own, other = max(own, 0.0), max(other, 0.0)
+    return float(np.log((own + CONDUCTANCE_EPSILON) / (other + CONDUCTANCE_EPSILON)))
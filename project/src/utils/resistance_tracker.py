@@ -0,0 +1,97 @@
+from __future__ import annotations
+from .resistance import get_log_ratio, solve_conductances
+from .heuristics_func import Heuristic, get_other_player
+from ..game.game import Game, PlayerOrder, MoveRecord, MOVE_TYPE, Tracker
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import numpy as np
+
+# (conductance, potentials) of the network of each player
+SOLUTION = dict[PlayerOrder, tuple[float, np.ndarray]]
+
+
+class ResistanceTracker(Tracker):
+    """Resistor network solutions of the positions from the root to the current one.
+
+    A position is solved when it is first evaluated, starting from the
+    potentials of the nearest solved position above it. The children
+    evaluated together by evaluate_moves are solved in one batched system
+    and kept for their own evaluate.
+    """
+
+    def __init__(self, game: Game) -> None:
+        self.game = game
+        width, height = game.get_size()
+        self.start, self.end = width * height, width * height + 1
+        # Solution of each position of the path, None until evaluated
+        self.stack: list[Optional[SOLUTION]] = [None]
+        # Solutions of the children of the last evaluate_moves, by zobrist key
+        self.children: dict[int, SOLUTION] = {}
+
+    # REQUESTS
+    def evaluate(self, player: PlayerOrder) -> float:
+        """Return the resistance value of the player, as heuristics_func.resistance"""
+        solution = self.get_solution()
+        return get_log_ratio(solution[player][0], solution[get_other_player(player)][0])
+
+    def evaluate_moves(self, moves: list[MOVE_TYPE], player: PlayerOrder) -> list[float]:
+        """Return the resistance value of the player after each of the moves, solved in one batch"""
+        parent = self.get_solution()
+        game = self.game
+        keys, adjacencies, initial = [], [], []
+        for move in moves:
+            game.push_move(move)
+            keys.append(game.get_zobrist_key())
+            adjacencies.extend(game.get_adjacency_matrix(p) for p in PlayerOrder)
+            initial.extend(parent[p][1] for p in PlayerOrder)
+            game.pop_move()
+        conductances, potentials = solve_conductances(adjacencies, self.start, self.end, initial)
+
+        self.children = {}
+        values = []
+        for index, key in enumerate(keys):
+            solution = {
+                p: (conductances[2 * index + i], potentials[2 * index + i])
+                for i, p in enumerate(PlayerOrder)
+            }
+            self.children[key] = solution
+            values.append(get_log_ratio(solution[player][0], solution[get_other_player(player)][0]))
+        return values
+
+    def get_solution(self) -> SOLUTION:
+        """Return the solution of the current position, solving it if needed"""
+        solution = self.stack[-1]
+        if solution is not None:
+            return solution
+        solution = self.children.get(self.game.get_zobrist_key())
+        if solution is None:
+            ancestor = next((item for item in reversed(self.stack) if item is not None), None)
+            initial = [ancestor[p][1] for p in PlayerOrder] if ancestor else None
+            conductances, potentials = solve_conductances(
+                [self.game.get_adjacency_matrix(p) for p in PlayerOrder], self.start, self.end, initial
+            )
+            solution = {p: (conductances[i], potentials[i]) for i, p in enumerate(PlayerOrder)}
+        self.stack[-1] = solution
+        return solution
+
+    # COMMANDS
+    def push_move(self, record: MoveRecord) -> None:
+        """Add the new position, solved on demand"""
+        self.stack.append(None)
+
+    def pop_move(self, record: MoveRecord) -> None:
+        """Drop the solution of the position"""
+        self.stack.pop()
+
+
+@contextmanager
+def incremental_resistance(game: Game, enabled: bool = True) -> Iterator[None]:
+    """Attach a ResistanceTracker to the game for the duration of a search"""
+    if not enabled or game.is_over():
+        yield
+        return
+    game.add_tracker(Heuristic.RESISTANCE.value, ResistanceTracker(game))
+    try:
+        yield
+    finally:
+        game.remove_tracker(Heuristic.RESISTANCE.value)
@@ -0,0 +1,166 @@
+from ..manager.manager import Manager, SearchCancelled
+from ..game.game import Game, MOVE_TYPE
+from dataclasses import dataclass
+from typing import Optional
+from enum import Enum
+import threading
+import logging
+import time
+
+
+class JobState(Enum):
+    """Enum for the states of a search job"""
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class SearchProgress:
+    """Snapshot of a running search"""
+    state: str
+    # Depth of the search which found the best move, 0 if the manager does not report it
+    depth: int
+    best_move: Optional[MOVE_TYPE]
+    nodes: int
+    nodes_per_sec: float
+    elapsed_ms: float
+
+
+class SearchJob:
+    """The get_move of a manager, run on a copy of the game in a background thread.
+
+    The manager checks its cancelled flag at every node, or while waiting
+    for its worker processes. A cancelled job stops there and leaves the
+    game untouched.
+    """
+
+    def __init__(self, manager: Manager, game: Game) -> None:
+        self.manager = manager
+        # Position the move is searched for
+        self.key = game.get_zobrist_key()
+        self.ply = len(game.get_move_history())
+        self.state = JobState.RUNNING
+        self.move: Optional[MOVE_TYPE] = None
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.start_nodes = manager.nodes
+        manager.cancelled = False
+        manager.report_progress(0, None)
+        self.thread = threading.Thread(target=self.run, args=(game.copy(),), daemon=True)
+        self.thread.start()
+
+    # REQUESTS
+    def is_done(self) -> bool:
+        """Check if the search is over, whatever its outcome"""
+        return self.state != JobState.RUNNING
+
+    def is_for(self, manager: Manager, game: Game) -> bool:
+        """Check if the job searches the position of the game with the manager"""
+        return (
+            self.manager is manager
+            and self.key == game.get_zobrist_key()
+            and self.ply == len(game.get_move_history())
+        )
+
+    def get_progress(self) -> SearchProgress:
+        """Return the depth, best move and speed of the search"""
+        end = self.end if self.end is not None else time.perf_counter()
+        elapsed = end - self.start
+        nodes = self.manager.nodes - self.start_nodes
+        return SearchProgress(
+            state=self.state.value,
+            depth=self.manager.progress_depth,
+            best_move=self.manager.progress_move,
+            nodes=nodes,
+            nodes_per_sec=nodes / elapsed if elapsed > 0 else 0.0,
+            elapsed_ms=elapsed * 1000,
+        )
+
+    # COMMANDS
+    def run(self, game: Game) -> None:
+        """Search the move, in the background thread"""
+        try:
+            self.move = self.manager.get_move(game)
+            self.state = JobState.DONE
+        except SearchCancelled:
+            self.state = JobState.CANCELLED
+        except Exception:
+            logging.exception("Background search failed")
+            self.state = JobState.FAILED
+        self.end = time.perf_counter()
+
+    def cancel(self) -> None:
+        """Ask the search to stop, without waiting for the thread to end"""
+        self.manager.cancelled = True
+
+
+class SearchWorker:
+    """Run the searches of the managers in the background, one at a time.
+
+    poll is a player controller for Game.update which never blocks: it
+    starts the search of the position, then returns None until its move is
+    found. A cancelled job is left to end on its own, the next search or
+    the reset of its manager happens once it has.
+    """
+
+    def __init__(self) -> None:
+        self.job: Optional[SearchJob] = None
+        # Cancelled jobs whose thread may still be running
+        self.stopping: list[SearchJob] = []
+        # Managers to reset once their cancelled jobs have ended
+        self.pending_resets: list[Manager] = []
+
+    # REQUESTS
+    def get_progress(self) -> Optional[SearchProgress]:
+        """Return the progress of the current search, None if there is none"""
+        if self.job is None:
+            return None
+        return self.job.get_progress()
+
+    def is_stopping(self, manager: Manager) -> bool:
+        """Check if a cancelled job of the manager is still running"""
+        return any(job.manager is manager and not job.is_done() for job in self.stopping)
+
+    # COMMANDS
+    def poll(self, manager: Manager, game: Game) -> Optional[MOVE_TYPE]:
+        """Return the move of the manager for the game once searched, None until then"""
+        if self.job is not None and not self.job.is_for(manager, game):
+            self.cancel()
+        self.stopping = [job for job in self.stopping if not job.is_done()]
+        self.apply_resets()
+        if self.job is None:
+            # Two searches can not share the state of a manager
+            if self.is_stopping(manager):
+                return None
+            self.job = SearchJob(manager, game)
+            return None
+        if not self.job.is_done():
+            return None
+        job, self.job = self.job, None
+        logging.debug(f"Background search {job.state.value} with {job.get_progress()}")
+        return job.move
+
+    def cancel(self) -> None:
+        """Stop the current search, if any, without blocking"""
+        if self.job is not None:
+            self.job.cancel()
+            self.stopping.append(self.job)
+            self.job = None
+
+    def reset(self, manager: Manager) -> None:
+        """Cancel the current search and reset the manager, once its search has ended"""
+        self.cancel()
+        if self.is_stopping(manager):
+            if manager not in self.pending_resets:
+                self.pending_resets.append(manager)
+        else:
+            manager.reset()
+
+    def apply_resets(self) -> None:
+        """Reset the managers whose cancelled jobs have ended"""
+        for manager in list(self.pending_resets):
+            if not self.is_stopping(manager):
+                manager.reset()
+                self.pending_resets.remove(manager)
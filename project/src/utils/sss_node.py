@@ -0,0 +1,27 @@
+from __future__ import annotations
+from ..game.game import MOVE_TYPE
+from typing import Optional
+
+
+class SSSNode:
+    """Node of an SSS* tree, reached by playing move from the node at index parent.
+
+    The game is not stored, it is rebuilt by pushing the moves from the
+    root. The root has no move and parent -1.
+    """
+
+    __slots__ = ("move", "parent")
+
+    def __init__(self, move: Optional[MOVE_TYPE], parent: int) -> None:
+        self.move = move
+        self.parent = parent
+
+
+def get_path(nodes: list[SSSNode], index: int) -> list[int]:
+    """Return the indexes of the nodes from the root (excluded) to the node at index"""
+    path = []
+    while index > 0:
+        path.append(index)
+        index = nodes[index].parent
+    path.reverse()
+    return path
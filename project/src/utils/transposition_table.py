@@ -0,0 +1,123 @@
+from ..game.game import MOVE_TYPE
+from typing import Optional
+from array import array
+from enum import Enum
+
+
+class Flag(Enum):
+    """Enum for the kind of value stored in an entry"""
+    EXACT = 0
+    LOWERBOUND = 1
+    UPPERBOUND = 2
+
+
+FLAGS = tuple(Flag)
+NO_MOVE = -1
+EMPTY_DEPTH = -1
+# key (Q), value (d), move (i), depth (b), flag (b), generation (B)
+ENTRY_SIZE = 8 + 8 + 4 + 1 + 1 + 1
+# Slot 0 of a bucket keeps the deepest entry, slot 1 is always replaced
+BUCKET_SIZE = 2
+
+TT_ENTRY = tuple[float, Flag, int, Optional[MOVE_TYPE]]
+
+
+class TranspositionTable:
+    """Fixed size transposition table keyed by the Zobrist key of the position"""
+
+    def __init__(self, size_mb: int) -> None:
+        if size_mb < 1:
+            raise ValueError("Transposition table size should be at least 1 MB")
+        self.bucket_count = max(1, (size_mb << 20) // (ENTRY_SIZE * BUCKET_SIZE))
+        entry_count = self.bucket_count * BUCKET_SIZE
+
+        self.keys = array("Q", bytes(8 * entry_count))
+        self.values = array("d", bytes(8 * entry_count))
+        self.moves = array("i", [NO_MOVE]) * entry_count
+        self.depths = array("b", [EMPTY_DEPTH]) * entry_count
+        self.flags = array("b", bytes(entry_count))
+        self.generations = array("B", bytes(entry_count))
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    # REQUESTS
+    def probe(self, key: int) -> Optional[TT_ENTRY]:
+        """Return (value, flag, depth, move) stored for the key, None if absent"""
+        index = (key % self.bucket_count) * BUCKET_SIZE
+        occupied = False
+        for slot in range(index, index + BUCKET_SIZE):
+            if self.depths[slot] == EMPTY_DEPTH:
+                continue
+            if self.keys[slot] == key:
+                self.hits += 1
+                self.generations[slot] = self.generation
+                return (
+                    self.values[slot], FLAGS[self.flags[slot]],
+                    self.depths[slot], self.unpack_move(self.moves[slot])
+                )
+            occupied = True
+        self.misses += 1
+        if occupied:
+            self.collisions += 1
+        return None
+
+    def get_statistics(self) -> dict[str, float]:
+        """Return the hit, miss and collision counters of the table"""
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+    # COMMANDS
+    def store(self, key: int, value: float, flag: Flag, depth: int, move: Optional[MOVE_TYPE]) -> None:
+        """Store an entry, the deepest or the newest entry of a bucket is kept"""
+        index = (key % self.bucket_count) * BUCKET_SIZE
+        slot = index + 1
+        if (
+            self.keys[index] == key
+            or self.depths[index] == EMPTY_DEPTH
+            or self.generations[index] != self.generation
+            or depth >= self.depths[index]
+        ):
+            slot = index
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.moves[slot] = self.pack_move(move)
+        self.depths[slot] = depth
+        self.flags[slot] = flag.value
+        self.generations[slot] = self.generation
+        self.stores += 1
+
+    def new_search(self) -> None:
+        """Age the entries, older entries are replaced first"""
+        self.generation = (self.generation + 1) % 256
+
+    def clear(self) -> None:
+        """Remove all the entries and reset the counters"""
+        entry_count = self.bucket_count * BUCKET_SIZE
+        self.depths = array("b", [EMPTY_DEPTH]) * entry_count
+        self.generation = 0
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    # UTILS
+    @staticmethod
+    def pack_move(move: Optional[MOVE_TYPE]) -> int:
+        """Pack a move in an int"""
+        if move is None:
+            return NO_MOVE
+        return move[0] << 8 | move[1]
+
+    @staticmethod
+    def unpack_move(packed: int) -> Optional[MOVE_TYPE]:
+        """Unpack a move packed with pack_move"""
+        if packed == NO_MOVE:
+            return None
+        return packed >> 8, packed & 0xFF
@@ -0,0 +1,199 @@
+from __future__ import annotations
+from .heuristics_func import Heuristic, get_two_distance_maps
+from ..game.game import Game, PlayerOrder, MoveRecord, Tracker
+from contextlib import contextmanager
+from typing import Iterator
+import numpy as np
+import heapq
+
+# (list, index, previous value) of every change made by a move
+CHANGE_LOG = list[tuple[list[int], int, int]]
+
+
+class TwoDistanceTracker(Tracker):
+    """Start and end two-distance maps of both players, repaired around each move.
+
+    The graphs are kept as one int bitmask of neighbors per node, indexed
+    like Game.get_adjacency_matrix. A move removes a cell from both graphs
+    and connects its neighbors in the graph of the player. Only the values
+    of the nodes whose support changed are relabelled.
+    """
+
+    def __init__(self, game: Game) -> None:
+        width, height = game.get_size()
+        self.high_value = width * height
+        self.start, self.end = width * height, width * height + 1
+        self.height = height
+
+        self.rows: dict[PlayerOrder, list[int]] = {
+            player: self.to_bitmasks(game.get_adjacency_matrix(player)) for player in PlayerOrder
+        }
+        empty_vector = game.get_empty_vector()
+        self.empty = self.to_bitmasks(empty_vector[None, :])[0]
+
+        adjacency = np.stack([game.get_adjacency_matrix(player) for player in PlayerOrder]).repeat(2, axis=0)
+        targets = np.tile((self.start, self.end), 2)
+        maps = get_two_distance_maps(adjacency, np.stack([empty_vector] * 4), targets, self.high_value)
+        # values[player] is (start map, end map)
+        self.values: dict[PlayerOrder, tuple[list[int], list[int]]] = {
+            player: (maps[2 * i].tolist(), maps[2 * i + 1].tolist())
+            for i, player in enumerate(PlayerOrder)
+        }
+
+        self.history: list[CHANGE_LOG] = []
+
+    # REQUESTS
+    def evaluate(self, player: PlayerOrder) -> float:
+        """Return the two distance of the player, as heuristics_func.two_distance"""
+        opponent = PlayerOrder.PLAYER1 if player == PlayerOrder.PLAYER2 else PlayerOrder.PLAYER2
+        return self.get_minimum(opponent) - self.get_minimum(player)
+
+    def get_minimum(self, player: PlayerOrder) -> int:
+        """Return the smallest start + end distance over the empty cells"""
+        start_values, end_values = self.values[player]
+        return min(start_values[index] + end_values[index] for index in self.iter_bits(self.empty))
+
+    # COMMANDS
+    def push_move(self, record: MoveRecord) -> None:
+        """Remove the cell from both graphs and repair the four maps"""
+        x, y = record.move
+        cell = x * self.height + y
+        opponent = PlayerOrder.PLAYER1 if record.player == PlayerOrder.PLAYER2 else PlayerOrder.PLAYER2
+        log: CHANGE_LOG = []
+        self.history.append(log)
+        self.empty &= ~(1 << cell)
+
+        # Contract the cell in the graph of the player
+        rows = self.rows[record.player]
+        neighbors = rows[cell]
+        for neighbor in self.iter_bits(neighbors):
+            log.append((rows, neighbor, rows[neighbor]))
+            rows[neighbor] = (rows[neighbor] | neighbors) & ~(1 << neighbor | 1 << cell)
+        log.append((rows, cell, neighbors))
+        rows[cell] = 0
+        for values in self.values[record.player]:
+            self.repair(rows, values, cell, neighbors, log)
+
+        # Remove the cell from the graph of the opponent
+        rows = self.rows[opponent]
+        neighbors = rows[cell]
+        for neighbor in self.iter_bits(neighbors):
+            log.append((rows, neighbor, rows[neighbor]))
+            rows[neighbor] &= ~(1 << cell)
+        log.append((rows, cell, neighbors))
+        rows[cell] = 0
+        for values in self.values[opponent]:
+            self.repair(rows, values, cell, neighbors, log)
+
+    def pop_move(self, record: MoveRecord) -> None:
+        """Restore the graphs and the maps from before the move"""
+        x, y = record.move
+        self.empty |= 1 << (x * self.height + y)
+        for values, index, previous in reversed(self.history.pop()):
+            values[index] = previous
+
+    def repair(self, rows: list[int], values: list[int], cell: int, changed: int, log: CHANGE_LOG) -> None:
+        """Relabel the nodes of one map after cell was removed and the rows of changed were updated"""
+        high_value = self.high_value
+        target = self.start if values[self.start] == 0 else self.end
+        virtual = 1 << self.start | 1 << self.end
+        changed &= ~virtual
+        if values[cell] != high_value:
+            log.append((values, cell, values[cell]))
+            values[cell] = high_value
+
+        # Drop the values which lost their support, by increasing value so that
+        # the possible supporters of a node are settled before it
+        heap = [(values[node], node) for node in self.iter_bits(changed) if values[node] != high_value]
+        heapq.heapify(heap)
+        invalid = 0
+        while heap:
+            value, node = heapq.heappop(heap)
+            if values[node] != value or self.is_supported(rows[node], values, value, target):
+                continue
+            log.append((values, node, value))
+            values[node] = high_value
+            invalid |= 1 << node
+            for neighbor in self.iter_bits(rows[node] & ~virtual):
+                if value < values[neighbor] != high_value:
+                    heapq.heappush(heap, (values[neighbor], neighbor))
+
+        # Lower the values from the dropped and changed nodes outward
+        heap = []
+        for node in self.iter_bits(invalid | changed):
+            candidate = self.get_candidate(rows[node], values, target)
+            if candidate < values[node]:
+                heap.append((candidate, node))
+        heapq.heapify(heap)
+        while heap:
+            value, node = heapq.heappop(heap)
+            if value >= values[node]:
+                continue
+            log.append((values, node, values[node]))
+            values[node] = value
+            for neighbor in self.iter_bits(rows[node] & ~virtual):
+                # A neighbor can at best get value + 1 through this node
+                if values[neighbor] <= value + 1:
+                    continue
+                candidate = self.get_candidate(rows[neighbor], values, target)
+                if candidate < values[neighbor]:
+                    heapq.heappush(heap, (candidate, neighbor))
+
+    # UTILS
+    def is_supported(self, row: int, values: list[int], value: int, target: int) -> bool:
+        """Check if a node of the given value still has its target or two smaller neighbors"""
+        if row >> target & 1:
+            return True
+        count = 0
+        # Inlined iter_bits, this is the hot loop of the repair
+        while row:
+            low = row & -row
+            if values[low.bit_length() - 1] < value:
+                count += 1
+                if count == 2:
+                    return True
+            row ^= low
+        return False
+
+    def get_candidate(self, row: int, values: list[int], target: int) -> int:
+        """Return one more than the second smallest neighbor value, high value if unreachable"""
+        if row >> target & 1:
+            return 1
+        smallest = second = self.high_value
+        while row:
+            low = row & -row
+            value = values[low.bit_length() - 1]
+            if value < second:
+                if value < smallest:
+                    smallest, second = value, smallest
+                else:
+                    second = value
+            row ^= low
+        return second + 1 if second < self.high_value else self.high_value
+
+    @staticmethod
+    def to_bitmasks(matrix: np.ndarray) -> list[int]:
+        """Convert the rows of a boolean matrix to int bitmasks"""
+        packed = np.packbits(matrix, axis=1, bitorder="little")
+        return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+    @staticmethod
+    def iter_bits(bitmask: int) -> Iterator[int]:
+        """Yield the indexes of the set bits of the bitmask in increasing order"""
+        while bitmask:
+            low = bitmask & -bitmask
+            yield low.bit_length() - 1
+            bitmask ^= low
+
+
+@contextmanager
+def incremental_two_distance(game: Game, enabled: bool = True) -> Iterator[None]:
+    """Attach a TwoDistanceTracker to the game for the duration of a search"""
+    if not enabled or game.is_over():
+        yield
+        return
+    game.add_tracker(Heuristic.TWO_DISTANCE.value, TwoDistanceTracker(game))
+    try:
+        yield
+    finally:
+        game.remove_tracker(Heuristic.TWO_DISTANCE.value)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+from ..game.game import Game, PlayerOrder, MOVE_TYPE
+from dataclasses import dataclass
+from typing import Optional
+
+# Carriers kept for each pair of nodes, the smallest first found
+MAX_CONNECTIONS = 4
+MAX_SEMI_CONNECTIONS = 8
+
+
+@dataclass(frozen=True)
+class VirtualConnections:
+    """Connections between the two edges of a player found by H-search.
+
+    Carriers are bitmasks of the empty cells, cell (x, y) is bit
+    x * height + y. A connection holds even if the opponent moves first, a
+    semi connection holds if the player moves first.
+    """
+    connections: list[int]
+    semi_connections: list[int]
+
+
+@dataclass(frozen=True)
+class VirtualAnalysis:
+    """What the virtual connections of both players say about a position"""
+    # Player who wins the position whatever the opponent plays, if known
+    winner: Optional[PlayerOrder]
+    # Cells the player to move has to play in to stop a semi connection of
+    # the opponent, None if the opponent threatens nothing
+    mustplay: Optional[int]
+
+
+def h_search(game: Game, player: PlayerOrder) -> VirtualConnections:
+    """Find virtual connections of the player between its two edges with the AND / OR rules.
+
+    The nodes are the empty cells and the groups of stones of the player,
+    a group is its root in the union-find of the game and includes the
+    edges it touches. Two adjacent nodes are connected with an empty
+    carrier. The AND rule chains two connections with disjoint carriers
+    through a middle node, into a semi connection keyed by the middle if it
+    is an empty cell, else into a connection. The OR rule merges semi
+    connections whose carriers have an empty intersection into a connection.
+    """
+    stones = game.stones
+    union_find = game.union_find
+    neighbor_indexes = game.neighbor_table.neighbor_indexes
+    edges = game.union_links.edges[player.value - 1]
+    start, end = (union_find.find(node) for node in game.union_links.virtual_nodes[player.value - 1])
+    value = player.value
+
+    def get_node(cell: int) -> Optional[int]:
+        """Return the node of a cell, None for a stone of the opponent"""
+        stone = stones[cell]
+        if not stone:
+            return cell
+        if stone == value:
+            return union_find.find(cell)
+        return None
+
+    connections: dict[tuple[int, int], list[int]] = {}
+    semi_connections: dict[tuple[int, int], list[int]] = {}
+    # Connections of each node, to find the ones to chain with the AND rule
+    connections_of: dict[int, list[tuple[int, int]]] = {}
+    queue: list[tuple[int, int, int]] = []
+
+    def add_connection(first: int, second: int, carrier: int) -> None:
+        """Keep the connection unless a connection with a subset of its carrier is known"""
+        pair = (first, second) if first < second else (second, first)
+        carriers = connections.setdefault(pair, [])
+        if len(carriers) >= MAX_CONNECTIONS:
+            return
+        for known in carriers:
+            if known & carrier == known:
+                return
+        carriers.append(carrier)
+        connections_of.setdefault(first, []).append((second, carrier))
+        connections_of.setdefault(second, []).append((first, carrier))
+        queue.append((first, second, carrier))
+
+    def add_semi_connection(first: int, second: int, carrier: int) -> None:
+        """Keep the semi connection and try the OR rule with the others of the pair"""
+        pair = (first, second) if first < second else (second, first)
+        for known in connections.get(pair, ()):
+            if known & carrier == known:
+                return
+        carriers = semi_connections.setdefault(pair, [])
+        if len(carriers) >= MAX_SEMI_CONNECTIONS:
+            return
+        for known in carriers:
+            if known & carrier == known:
+                return
+        carriers.append(carrier)
+        union, intersection = carrier, carrier
+        for other in carriers[:-1]:
+            if intersection & other != intersection:
+                union |= other
+                intersection &= other
+                if not intersection:
+                    add_connection(first, second, union)
+                    return
+
+    for cell, stone in enumerate(stones):
+        if stone:
+            continue
+        for neighbor in neighbor_indexes[cell]:
+            node = get_node(neighbor)
+            # Each pair of empty cells once
+            if node is not None and (stones[neighbor] or neighbor > cell):
+                add_connection(cell, node, 0)
+        for edge in edges[cell]:
+            add_connection(cell, union_find.find(edge), 0)
+
+    while queue:
+        first, second, carrier = queue.pop()
+        for middle, other in ((first, second), (second, first)):
+            for node, middle_carrier in connections_of[middle].copy():
+                if node == other or carrier & middle_carrier:
+                    continue
+                # The ends of a chain must stay out of the carriers
+                if (middle_carrier >> other) & 1 or (carrier >> node) & 1:
+                    continue
+                if middle < len(stones) and not stones[middle]:
+                    add_semi_connection(other, node, carrier | middle_carrier | (1 << middle))
+                else:
+                    add_connection(other, node, carrier | middle_carrier)
+
+    pair = (start, end) if start < end else (end, start)
+    return VirtualConnections(
+        connections=connections.get(pair, []),
+        semi_connections=semi_connections.get(pair, []),
+    )
+
+
+def analyze(game: Game) -> VirtualAnalysis:
+    """Return the winner and the mustplay region given by the virtual connections of both players"""
+    player = game.get_current_player()
+    opponent = game.get_opponent()
+    own = h_search(game, player)
+    if own.connections or own.semi_connections:
+        return VirtualAnalysis(player, None)
+
+    threats = h_search(game, opponent)
+    if threats.connections:
+        return VirtualAnalysis(opponent, None)
+    if not threats.semi_connections:
+        return VirtualAnalysis(None, None)
+    mustplay = threats.semi_connections[0]
+    for carrier in threats.semi_connections[1:]:
+        mustplay &= carrier
+    if not mustplay:
+        return VirtualAnalysis(opponent, None)
+    return VirtualAnalysis(None, mustplay)
+
+
+def filter_mustplay(moves: list[MOVE_TYPE], mustplay: Optional[int], height: int) -> list[MOVE_TYPE]:
+    """Return the moves in the mustplay region, in the same order"""
+    if mustplay is None:
+        return moves
+    return [move for move in moves if (mustplay >> (move[0] * height + move[1])) & 1]
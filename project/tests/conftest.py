@@ -0,0 +1,34 @@
+from src.config import Config, load_config
+from src.game.game import Game
+from src.utils.game_func import match_game
+from pathlib import Path
+import random
+import pytest
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "default.toml"
+
+
+def make_config(size: int, backend: str = "graph") -> Config:
+    """Return the default config with a size x size board"""
+    config = load_config(str(CONFIG_PATH))
+    config.game.board_width = size
+    config.game.board_height = size
+    config.game.backend = backend
+    return config
+
+
+def random_game(config: Config, seed: int, stones: int) -> Game:
+    """Return a game after at most stones random moves, stopping at a game over"""
+    rng = random.Random(seed)
+    game = match_game(config, {})
+    game.create_board()
+    for _ in range(stones):
+        game.move(rng.choice(game.get_valid_moves(game.get_current_player())))
+        if game.is_over():
+            break
+    return game
+
+
+@pytest.fixture
+def config() -> Config:
+    return make_config(7)
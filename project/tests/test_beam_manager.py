@@ -0,0 +1,18 @@
+from src.manager.beam_manager import BeamManager
+from conftest import random_game
+import pytest
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_depth_two_beam_prefers_backed_up_values(config, seed):
+    game = random_game(config, seed, 8)
+    if game.is_over():
+        pytest.skip("Game over before the search")
+    manager = BeamManager(config, 2)
+    root = manager.search(game)
+    best = manager.get_best_child(root)
+    assert best.complete
+    for child in root.children:
+        if child.complete:
+            assert best.value >= child.value
+    assert manager.get_move(game) == best.move
@@ -0,0 +1,192 @@
+"""Compare the fast paths of the search with simpler reference implementations on seeded random positions"""
+from src.utils.heuristics_func import Heuristic, count_shortest_paths, get_other_player, get_two_distance, two_distance
+from src.utils.two_distance_tracker import TwoDistanceTracker
+from src.utils.resistance import GROUND_LEAK, solve_conductances
+from src.utils.neighbors import get_neighbor_table
+from src.utils.virtual_connections import analyze
+from src.game.game import Game, PlayerOrder
+from conftest import make_config, random_game
+from scipy.sparse.linalg import spsolve
+from typing import Optional
+import scipy.sparse as sp
+import networkx as nx
+import numpy as np
+import random
+import pytest
+
+BACKENDS = ["graph", "bitboard"]
+SEEDS = range(12)
+
+
+def random_position(backend: str, seed: int, min_size: int = 3, max_size: int = 7) -> Game:
+    """Return a game of random size after random moves, skip the test if it is over"""
+    rng = random.Random(seed)
+    size = rng.randint(min_size, max_size)
+    game = random_game(make_config(size, backend), seed, rng.randint(0, size * size // 2))
+    if game.is_over():
+        pytest.skip("Game over in the random moves")
+    return game
+
+
+def graph_two_distance(game: Game, player: PlayerOrder) -> float:
+    """two_distance computed on the networkx graphs, node by node"""
+    width, height = game.get_size()
+    minimums = {}
+    for p in (player, get_other_player(player)):
+        graph = game.get_graph(p)
+        start, end, _, _ = game.get_start_end_order_edge(p)
+        from_start = get_two_distance(game, graph, start, width * height)
+        from_end = get_two_distance(game, graph, end, width * height)
+        minimums[p] = min(from_start[node] + from_end[node] for node in game.get_valid_moves(p))
+    return minimums[get_other_player(player)] - minimums[player]
+
+
+def graph_winner(game: Game) -> Optional[PlayerOrder]:
+    """Return the player whose stones link their two edges, found with a path search"""
+    width, height = game.get_size()
+    table = get_neighbor_table(width, height)
+    edges = {
+        PlayerOrder.PLAYER1: (lambda x, y: x == 0, lambda x, y: x == width - 1),
+        PlayerOrder.PLAYER2: (lambda x, y: y == 0, lambda x, y: y == height - 1),
+    }
+    for player, (on_start, on_end) in edges.items():
+        cells = [cell for index, cell in enumerate(table.cells) if game.stones[index] == player.value]
+        graph = nx.Graph()
+        graph.add_nodes_from(("start", "end"))
+        for cell in cells:
+            graph.add_edges_from((cell, neighbor) for neighbor in table.neighbors[table.indexes[cell]] if neighbor in cells)
+            if on_start(*cell):
+                graph.add_edge("start", cell)
+            if on_end(*cell):
+                graph.add_edge("end", cell)
+        if nx.has_path(graph, "start", "end"):
+            return player
+    return None
+
+
+def solve(game: Game, memo: dict[int, bool]) -> bool:
+    """Check if the player to move wins, searching every move"""
+    key = game.get_zobrist_key()
+    if key not in memo:
+        memo[key] = False
+        for move in game.get_turbo_valid_moves(game.get_current_player()):
+            game.push_move(move)
+            won = game.is_over() or not solve(game, memo)
+            game.pop_move()
+            if won:
+                memo[key] = True
+                break
+    return memo[key]
+
+
+def direct_conductance(adjacency: np.ndarray, start: int, end: int) -> float:
+    """Return the conductance between start and end with a direct sparse solve of one network"""
+    inner = [node for node in range(len(adjacency)) if node not in (start, end)]
+    links = adjacency[np.ix_(inner, inner)].astype(float)
+    degrees = adjacency[inner].sum(axis=1)
+    laplacian = np.diag(np.where(degrees > 0, degrees + GROUND_LEAK, 1.0)) - links
+    potentials = spsolve(sp.csr_matrix(laplacian), adjacency[inner, start].astype(float))
+    start_row = adjacency[start, inner]
+    return float(start_row.sum() + adjacency[start, end] - start_row @ potentials)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_matrix_two_distance_matches_graph(backend, seed):
+    game = random_position(backend, seed)
+    for player in PlayerOrder:
+        assert two_distance(game, player) == graph_two_distance(game, player)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_two_distance_tracker_matches_recomputation(backend, seed):
+    game = random_position(backend, seed)
+    rng = random.Random(seed)
+    tracker = TwoDistanceTracker(game)
+    game.add_tracker(Heuristic.TWO_DISTANCE.value, tracker)
+    pushed = 0
+    while not game.is_over():
+        for player in PlayerOrder:
+            assert tracker.evaluate(player) == two_distance(game, player)
+        if pushed and rng.random() < 0.3:
+            game.pop_move()
+            pushed -= 1
+        else:
+            game.push_move(rng.choice(game.get_valid_moves(game.get_current_player())))
+            pushed += 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_union_find_winner_matches_path_search(backend, seed):
+    rng = random.Random(seed)
+    size = rng.randint(3, 7)
+    game = random_game(make_config(size, backend), seed, 0)
+    pushed = 0
+    while not game.is_over() or rng.random() < 0.5:
+        if game.is_over() or (pushed and rng.random() < 0.2):
+            game.pop_move()
+            pushed -= 1
+        else:
+            game.push_move(rng.choice(game.get_valid_moves(game.get_current_player())))
+            pushed += 1
+        winner = graph_winner(game)
+        assert game.get_winner() == winner
+        assert game.is_over() == (winner is not None)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", range(20))
+def test_virtual_connections_match_exhaustive_solver(backend, seed):
+    rng = random.Random(seed)
+    size = rng.randint(3, 4)
+    game = random_game(make_config(size, backend), seed, rng.randint(2, size * size // 2 + 1))
+    if game.is_over():
+        pytest.skip("Game over in the random moves")
+    memo: dict[int, bool] = {}
+    winning_moves = []
+    for move in game.get_turbo_valid_moves(game.get_current_player()):
+        game.push_move(move)
+        if game.is_over() or not solve(game, memo):
+            winning_moves.append(move)
+        game.pop_move()
+
+    analysis = analyze(game)
+    if analysis.winner is not None:
+        assert (analysis.winner == game.get_current_player()) == bool(winning_moves)
+    if analysis.mustplay is not None and winning_moves:
+        assert any((analysis.mustplay >> (x * size + y)) & 1 for x, y in winning_moves)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_shortest_path_counts_match_enumeration(backend, seed):
+    game = random_position(backend, seed, max_size=5)
+    width, height = game.get_size()
+    for player in PlayerOrder:
+        graph = game.get_graph(player)
+        start, end, _, _ = game.get_start_end_order_edge(player)
+        length, count = count_shortest_paths(game.get_adjacency_matrix(player), width * height, width * height + 1)
+        if nx.has_path(graph, start, end):
+            paths = list(nx.all_shortest_paths(graph, start, end))
+            assert (length, count) == (len(paths[0]) - 1, len(paths))
+        else:
+            assert (length, count) == (None, 0.0)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batched_conductances_match_direct_solve(backend, seed):
+    game = random_position(backend, seed, max_size=9)
+    width, height = game.get_size()
+    start, end = width * height, width * height + 1
+    potentials = None
+    for step in range(2):
+        if step:
+            # Warm started from the potentials of the position before the move
+            game.push_move(game.get_turbo_valid_moves(game.get_current_player())[0])
+        adjacencies = [game.get_adjacency_matrix(player) for player in PlayerOrder]
+        expected = [direct_conductance(adjacency, start, end) for adjacency in adjacencies]
+        conductances, potentials = solve_conductances(adjacencies, start, end, potentials)
+        assert conductances == pytest.approx(expected, rel=1e-4, abs=1e-6)
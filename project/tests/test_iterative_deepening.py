@@ -0,0 +1,15 @@
+from src.utils.iterative_deepening import Deadline, iterative_deepening
+from src.utils.heuristics_func import WIN_VALUE
+from conftest import make_config, random_game
+
+
+def test_large_heuristic_values_do_not_stop_the_deepening():
+    game = random_game(make_config(3), 0, 2)
+    _, _, depth = iterative_deepening(game, lambda depth, first_move: (5000.0, None), Deadline(60000))
+    assert depth == len(game.get_valid_moves(game.get_current_player()))
+
+
+def test_proven_losses_stop_the_deepening():
+    game = random_game(make_config(3), 0, 2)
+    _, _, depth = iterative_deepening(game, lambda depth, first_move: (-WIN_VALUE + depth, None), Deadline(60000))
+    assert depth == 1
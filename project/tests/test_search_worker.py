@@ -0,0 +1,56 @@
+from src.manager.manager import Manager
+from src.utils.search_worker import SearchWorker
+from conftest import random_game
+import threading
+import time
+
+
+class SlowManager(Manager):
+    """Manager whose searches last until they are cancelled, then a little longer"""
+
+    def __init__(self, config) -> None:
+        super().__init__(config)
+        self.searching = False
+        self.resets_during_search = 0
+        self.resets = 0
+        self.release = threading.Event()
+
+    def get_move(self, game):
+        self.searching = True
+        try:
+            while not self.cancelled:
+                time.sleep(0.001)
+            # Cleanup of a search which still uses the state of the manager
+            self.release.wait(5)
+            self.check_cancelled()
+        finally:
+            self.searching = False
+
+    def reset(self) -> None:
+        self.resets += 1
+        if self.searching:
+            self.resets_during_search += 1
+
+
+def test_reset_waits_for_the_cancelled_search(config):
+    game = random_game(config, 0, 2)
+    manager = SlowManager(config)
+    worker = SearchWorker()
+    assert worker.poll(manager, game) is None
+
+    worker.reset(manager)
+    assert manager.resets == 0
+    assert worker.poll(manager, game) is None
+
+    manager.release.set()
+    worker.stopping[0].thread.join(5)
+    assert worker.poll(manager, game) is None
+    assert manager.resets == 1
+    assert manager.resets_during_search == 0
+    worker.cancel()
+
+
+def test_reset_without_search_is_immediate(config):
+    manager = SlowManager(config)
+    SearchWorker().reset(manager)
+    assert manager.resets == 1
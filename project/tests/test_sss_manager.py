@@ -0,0 +1,31 @@
+from src.manager.sss_manager import SSSManager, HIGH_VALUE
+from src.utils.heuristics_func import Heuristic, evaluate
+from src.game.game import Game, PlayerOrder
+from conftest import make_config, random_game
+import random
+import pytest
+
+
+def minimax(game: Game, depth: int, ply: int, player: PlayerOrder) -> float:
+    """Value of the game with the leaf values of SSS*"""
+    if ply == depth or game.is_over():
+        return min(evaluate(game, player, Heuristic.TWO_DISTANCE) + depth - ply, HIGH_VALUE)
+    values = []
+    for move in game.get_turbo_valid_moves(game.get_current_player()):
+        game.push_move(move)
+        values.append(minimax(game, depth, ply + 1, player))
+        game.pop_move()
+    return max(values) if ply % 2 == 0 else min(values)
+
+
+@pytest.mark.parametrize("size", [3, 4])
+@pytest.mark.parametrize("seed", range(10))
+def test_sss_star_matches_minimax(size, seed):
+    config = make_config(size, "bitboard")
+    game = random_game(config, seed, random.Random(seed).randint(1, size * size - 3))
+    if game.is_over():
+        pytest.skip("Game over before the search")
+    player = game.get_current_player()
+    for depth in (2, 3):
+        value, _ = SSSManager(config, depth).sss_star(game, depth, player)
+        assert value == pytest.approx(minimax(game, depth, 0, player))
@@ -0,0 +1,58 @@
+from src.tournament import Tournament, Contestant
+from src.config import load_config
+import argparse
+import logging
+import os
+
+LOGGING_CONFIG = {
+    'level': logging.INFO,
+    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'datefmt': '%d-%b-%y %H:%M:%S',
+    'filename': 'log/tournament.log',
+    'filemode': 'w'
+}
+
+DEFAULT_CONFIG_PATH = "config/default.toml"
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(description="Play headless games between algorithms")
+    parser.add_argument(
+        "contestants", nargs="+",
+        help='algorithms as "name" or "name:depth", e.g. alpha_beta:3 random'
+    )
+    parser.add_argument("-n", "--games", type=int, default=10, help="games per pairing")
+    parser.add_argument("-r", "--round-robin", action="store_true", help="play every pair of contestants")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="processes, all the cpus by default")
+    parser.add_argument("--opening", type=int, default=0, help="random moves played before the contestants")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the openings and of the random managers")
+    parser.add_argument("-c", "--config", default=None, help="config name in the config folder")
+    parser.add_argument("-o", "--output", default="log/tournament.jsonl", help="results, .jsonl or .csv")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    if not os.path.exists("log"):
+        os.makedirs("log")
+
+    logging.basicConfig(**LOGGING_CONFIG)
+    logging.info("Starting tournament.py")
+
+    args = parse_args()
+    path = f"config/{args.config}.toml" if args.config else DEFAULT_CONFIG_PATH
+    logging.info(f"Using config path : {path}")
+
+    tournament = Tournament(
+        load_config(path),
+        [Contestant.parse(spec) for spec in args.contestants],
+        args.round_robin,
+    )
+    output_format = "csv" if args.output.endswith(".csv") else "jsonl"
+    with open(args.output, "w", newline="") as output:
+        wins = tournament.run(
+            args.games, output, output_format, args.workers, args.opening, args.seed
+        )
+
+    for (pairing, seat), count in wins.items():
+        print(f"pairing {pairing} {seat} {tournament.get_contestant(pairing, seat)} wins: {count}")